@@ -1,7 +1,15 @@
+import threading
 import streamlit as st
 import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from src.sql.sql_queries import *
 from src.sql.sql_analysis import PhonePeAnalytics
+from src.sql.backend import default_engine, check_backend
+from src.sql.executor import run_queries
+from src.sql.cache import CACHE_BACKEND, CACHE_TTL, data_version
+from src.sql.snapshot import SnapshotAnalytics, check_snapshot, snapshot_version
+from src.etl.metadata import filter_options, catalog_rows
+from src.config import DASHBOARD_SOURCE
 from src.visualization import *
 
 st.set_page_config(
@@ -402,8 +410,74 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize analytics
-analytics = PhonePeAnalytics()
+# One engine (and connection pool) per server process, shared by every session
+@st.cache_resource
+def get_shared_engine():
+    return default_engine()
+
+# Serving a snapshot needs no database until the Raw Data tab pages through a table
+if not st.session_state.get('db_connected'):
+    if DASHBOARD_SOURCE == 'snapshot':
+        connected, connection_message = check_snapshot()
+    else:
+        connected, connection_message = check_backend(get_shared_engine())
+    if not connected:
+        st.error(connection_message)
+        st.stop()
+    st.session_state['db_connected'] = True
+
+# Initialize analytics once per process. st.cache_data below already keeps results in
+# memory, so the analytics cache is only used when it is shared on disk between servers.
+# With DASHBOARD_SOURCE=snapshot every result comes from the precomputed snapshot instead
+@st.cache_resource
+def get_analytics():
+    if DASHBOARD_SOURCE == 'snapshot':
+        return SnapshotAnalytics()
+    return PhonePeAnalytics(get_shared_engine(), use_cache=CACHE_BACKEND == 'disk')
+
+def results_version():
+    return snapshot_version() if DASHBOARD_SOURCE == 'snapshot' else data_version()
+
+# Query results are cached per method and filters; the data version changes after
+# every ETL load (or snapshot build), so a reload never serves stale results
+@st.cache_data(ttl=CACHE_TTL, max_entries=256, show_spinner=False)
+def cached_query(method_name, version, *args, **kwargs):
+    return getattr(get_analytics(), method_name)(*args, **kwargs)
+
+def run_query(method_name, *args, **kwargs):
+    return cached_query(method_name, results_version(), *args, **kwargs)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=256, show_spinner=False)
+def cached_page(version, *args, **kwargs):
+    return fetch_table_page(*args, **kwargs)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=256, show_spinner=False)
+def cached_count(version, *args):
+    return count_table_rows(*args)
+
+# Filter options and row counts come from the metadata table the ETL maintains,
+# read once per data version
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_catalog(version):
+    catalog = cached_query('get_data_catalog', version)
+    return catalog, filter_options(catalog)
+
+def get_catalog():
+    return cached_catalog(results_version())
+
+# Independent queries of a section run concurrently, each on its own pooled connection
+def run_panel(queries):
+    version = results_version()
+    ctx = get_script_run_ctx()
+
+    def query_in_session(method_name, *args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return cached_query(method_name, version, *args, **kwargs)
+
+    return run_queries({
+        name: (query_in_session, (method_name, *args), *kwargs)
+        for name, (method_name, args, *kwargs) in queries.items()
+    })
 
 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -414,14 +488,15 @@ st.markdown('<p class="subtitle">Explore India\'s Digital Payment Trends</p>', u
 # Sidebar filters
 
 st.markdown("### Filters")
+catalog, options = get_catalog()
 col1, col2 = st.columns(2)
 
 with col1:
-    year_options = ["All", 2018, 2019, 2020, 2021, 2022]
+    year_options = ["All"] + options['years']
     selected_year = st.selectbox(" Select Year", year_options, index=len(year_options)-1)
 
 with col2:
-    quarter_options = ["All", 1, 2, 3, 4]
+    quarter_options = ["All"] + options['quarters']
     selected_quarter = st.selectbox(" Select Quarter", quarter_options)
     
 
@@ -430,134 +505,33 @@ year_val = None if selected_year == "All" else selected_year
 quarter_val = None if selected_quarter == "All" else selected_quarter
 
 
-# Main tabs
-tabs = st.tabs([
-    "Overview",
-    "Transactions",
-    "Users",
-    "Insurance",
-    "Raw Data",
-    "Insights"
-])
-
-# ==================== OVERVIEW TAB ====================
-with tabs[0]:
-    st.markdown('<h2 class="section-header">Executive Summary</h2>', unsafe_allow_html=True)
-    
-    # Get executive summary
-    summary_df = analytics.get_executive_summary(year_val, quarter_val)
-    
-    if not summary_df.empty:
-        summary = summary_df.iloc[0]
+# Main sections. Only the selected section runs, so its queries and figures are the
+# only ones built on each rerun (st.tabs would execute all six every time)
+SECTION_NAMES = ["Overview", "Transactions", "Users", "Insurance", "Raw Data", "Insights"]
+selected_section = st.segmented_control(
+    "Section", SECTION_NAMES, default=SECTION_NAMES[0], key="section", label_visibility="collapsed"
+) or SECTION_NAMES[0]
 
-        def safe_divide(value, divisor=10000000):
-            return (value / divisor) if value is not None else 0
-            
-        # Top metrics row
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            trans_amount = safe_divide(summary.get('total_transaction_amount'))
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Transaction Amount</div>
-                    <div class="metric-value">₹ {trans_amount:.2f} Cr</div>
-                </div>
-            ''', unsafe_allow_html=True)
-        
-        with col2:
-            trans_count = safe_divide(summary.get('total_transactions'))
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Total Transactions</div>
-                    <div class="metric-value">₹ {trans_count:.2f} Cr</div>
-                </div>
-            ''', unsafe_allow_html=True)
-        
-        with col3:
-            total_users = safe_divide(summary.get('total_users'))
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Registered Users</div>
-                    <div class="metric-value">{total_users:.2f} Cr</div>
-                </div>
-            ''', unsafe_allow_html=True)
-        
-        with col4:
-            avg_trans = summary['avg_transaction_value']
-            avg_trans = avg_trans if avg_trans is not None else 0
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Avg Transaction</div>
-                    <div class="metric-value">₹ {avg_trans:.2f}</div>
-                </div>
-            ''', unsafe_allow_html=True)
+# Display names back to the state slugs stored in the tables
+STATE_SLUGS = {name: slug for slug, name in STATE_MAPPING.items()}
 
-        st.markdown(" ")
-        
-        # Second row metrics
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            app_opens = safe_divide(summary.get('total_app_opens'))
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">App Opens</div>
-                    <div class="metric-value">{app_opens:.2f} Cr</div>
-                </div>
-            ''', unsafe_allow_html=True)
-        
-        with col2:
-            insurance_amt = safe_divide(summary.get('total_insurance_amount'))
+# Heatmap labels per data type: (metric name, unit, count label)
+HEATMAP_METRICS = {
+    "Transactions": ("Transaction Amount", "₹ Cr", "Transactions"),
+    "Users": ("Registered Users", "Cr", "App Opens"),
+    "Insurance": ("Insurance Amount", "₹ Cr", "Policies")
+}
 
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Insurance Amount</div>
-                    <div class="metric-value">₹ {insurance_amt:.2f} Cr</div>
-                </div>
-            ''', unsafe_allow_html=True)
-        
-        with col3:
-            policies = safe_divide(summary.get('total_policies'))
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Insurance Policies</div>
-                    <div class="metric-value">{policies:.2f} Cr</div>
-                </div>
-            ''', unsafe_allow_html=True)
-    
-    else:
-        st.warning("No data available for the selected year and quarter.")
-
-    
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    # Top performing states
-    st.markdown("### Top Performing States")
-    st.markdown('<p class="subtitle">Top 10 Aggregated Transaction Table</p>', unsafe_allow_html=True)
-    top_states_df = analytics.get_top_states_by_transaction_amount(year_val, quarter_val, limit=10)
+# ==================== OVERVIEW TAB ====================
+def render_overview():
+    st.markdown('<h2 class="section-header">Executive Summary</h2>', unsafe_allow_html=True)
     
-    col1, col2 = st.columns([2, 1])
+    # The summary, top states and heatmap queries are independent, so they run
+    # together once the heatmap filters below are known; their sections are
+    # filled into these placeholders
+    summary_area = st.container()
+    top_states_area = st.container()
     
-    if not top_states_df.empty:
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            fig = plot_top_states_bar(top_states_df, top_n=10)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.markdown("<br>", unsafe_allow_html=True)
-            st.dataframe(
-                top_states_df[['state', 'trans_amount', 'trans_count']].head(10),
-                use_container_width=True,
-                height=400
-            )
-    else:
-        st.info("No transaction data available for the selected period.")
-    
-    st.markdown("<br>", unsafe_allow_html=True)
-
     # ============ INDIA GEOGRAPHIC HEATMAP ============
 
     st.markdown('<h2 class="section-header">India Geographic Heatmap</h2>', unsafe_allow_html=True)
@@ -567,20 +541,22 @@ with tabs[0]:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        heatmap_year_options = [2018, 2019, 2020, 2021, 2022]
+        heatmap_year_options = options['years']
         heatmap_year = st.selectbox("Year", heatmap_year_options, index=len(heatmap_year_options)-1, key="heatmap_year")
     
     with col2:
-        heatmap_quarter_options = [1, 2, 3, 4]
+        heatmap_quarter_options = options['quarters']
         heatmap_quarter = st.selectbox("Quarter", heatmap_quarter_options, index=0, key="heatmap_quarter")
     
     with col3:
         heatmap_data_type = st.selectbox("Data Type", ["Transactions", "Users", "Insurance"], key="heatmap_data_type")
     
     with col4:
-        # Category options based on data type
+        # Category options based on data type: the types loaded into its aggregated table
         if heatmap_data_type == "Transactions":
-            category_options = ["All Categories", "Recharge & bill payments", "Peer-to-peer payments", "Merchant payments", "Financial Services", "Others"]
+            category_options = ["All Categories"] + options['categories'].get('aggr_transaction', [])
+        elif heatmap_data_type == "Insurance":
+            category_options = ["All Categories"] + options['categories'].get('aggr_insurance', [])
         else:
             category_options = ["All Categories"]
         
@@ -591,148 +567,163 @@ with tabs[0]:
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Fetch data based on filters
+    # Fetch every panel at once. A failing heatmap query reports its own error
+    # below, and the queries that succeeded are served from the cache on retry.
+    panel = {
+        'summary': ('get_executive_summary', (year_val, quarter_val)),
+        'top_states': ('get_top_states_by_transaction_amount', (year_val, quarter_val), {'limit': 10})
+    }
+    heatmap_query = ('get_heatmap_data', (
+        heatmap_data_type,
+        heatmap_data_level,
+        heatmap_year,
+        heatmap_quarter,
+        None if heatmap_category == "All Categories" else heatmap_category
+    ))
+    heatmap_error = None
     try:
-        if heatmap_data_level == "State":
-            if heatmap_data_type == "Transactions":
-                heatmap_df = get_aggr_transaction(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    if heatmap_category != "All Categories":
-                        heatmap_df = heatmap_df[heatmap_df['trans_type'] == heatmap_category]
-                    
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'trans_amount': 'sum',
-                        'trans_count': 'sum'
-                    })
-                    heatmap_data.rename(columns={'trans_amount': 'value', 'trans_count': 'count'}, inplace=True)
-                    metric_name = "Transaction Amount"
-                    metric_unit = "₹ Cr"
-                    count_label = "Transactions"
+        results = run_panel({**panel, 'heatmap': heatmap_query})
+    except Exception as e:
+        heatmap_error = e
+        results = run_panel(panel)
+    
+    with summary_area:
+        summary_df = results['summary']
+        
+        if not summary_df.empty:
+            summary = summary_df.iloc[0]
+
+            def safe_divide(value, divisor=10000000):
+                return (value / divisor) if value is not None else 0
                 
-            elif heatmap_data_type == "Users":
-                heatmap_df = get_aggr_user(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'registered_user': 'sum',
-                        'app_opens': 'sum'
-                    })
-                    heatmap_data.rename(columns={'registered_user': 'value', 'app_opens': 'count'}, inplace=True)
-                    metric_name = "Registered Users"
-                    metric_unit = "Cr"
-                    count_label = "App Opens"
+            # Top metrics row
+            col1, col2, col3, col4 = st.columns(4)
             
-            else:  # Insurance
-                heatmap_df = get_aggr_insurance(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    if heatmap_category != "All Categories":
-                        heatmap_df = heatmap_df[heatmap_df['insurance_type'] == heatmap_category]
-                    
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'insurance_amount': 'sum',
-                        'insurance_count': 'sum'
-                    })
-                    heatmap_data.rename(columns={'insurance_amount': 'value', 'insurance_count': 'count'}, inplace=True)
-                    metric_name = "Insurance Amount"
-                    metric_unit = "₹ Cr"
-                    count_label = "Policies"
-        
-        elif heatmap_data_level == "District":
-            # Use map data for district level
-            if heatmap_data_type == "Transactions":
-                heatmap_df = get_map_transaction(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    if heatmap_category != "All Categories":
-                        heatmap_df = heatmap_df[heatmap_df['trans_type'] == heatmap_category]
-                    
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'trans_amount': 'sum',
-                        'trans_count': 'sum'
-                    })
-                    heatmap_data.rename(columns={'trans_amount': 'value', 'trans_count': 'count'}, inplace=True)
-                    metric_name = "Transaction Amount"
-                    metric_unit = "₹ Cr"
-                    count_label = "Transactions"
+            with col1:
+                trans_amount = safe_divide(summary.get('total_transaction_amount'))
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">Transaction Amount</div>
+                        <div class="metric-value">₹ {trans_amount:.2f} Cr</div>
+                    </div>
+                ''', unsafe_allow_html=True)
+            
+            with col2:
+                trans_count = safe_divide(summary.get('total_transactions'))
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">Total Transactions</div>
+                        <div class="metric-value">₹ {trans_count:.2f} Cr</div>
+                    </div>
+                ''', unsafe_allow_html=True)
+            
+            with col3:
+                total_users = safe_divide(summary.get('total_users'))
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">Registered Users</div>
+                        <div class="metric-value">{total_users:.2f} Cr</div>
+                    </div>
+                ''', unsafe_allow_html=True)
+            
+            with col4:
+                avg_trans = summary['avg_transaction_value']
+                avg_trans = avg_trans if avg_trans is not None else 0
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">Avg Transaction</div>
+                        <div class="metric-value">₹ {avg_trans:.2f}</div>
+                    </div>
+                ''', unsafe_allow_html=True)
+
+            st.markdown(" ")
             
-            elif heatmap_data_type == "Users":
-                heatmap_df = get_map_user(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'registered_user': 'sum',
-                        'app_opens': 'sum'
-                    })
-                    heatmap_data.rename(columns={'registered_user': 'value', 'app_opens': 'count'}, inplace=True)
-                    metric_name = "Registered Users"
-                    metric_unit = "Cr"
-                    count_label = "App Opens"
+            # Second row metrics
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                app_opens = safe_divide(summary.get('total_app_opens'))
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">App Opens</div>
+                        <div class="metric-value">{app_opens:.2f} Cr</div>
+                    </div>
+                ''', unsafe_allow_html=True)
             
-            else:  # Insurance
-                heatmap_df = get_map_insurance(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    if heatmap_category != "All Categories":
-                        heatmap_df = heatmap_df[heatmap_df['insurance_type'] == heatmap_category]
-                    
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'insurance_amount': 'sum',
-                        'insurance_count': 'sum'
-                    })
-                    heatmap_data.rename(columns={'insurance_amount': 'value', 'insurance_count': 'count'}, inplace=True)
-                    metric_name = "Insurance Amount"
-                    metric_unit = "₹ Cr"
-                    count_label = "Policies"
+            with col2:
+                insurance_amt = safe_divide(summary.get('total_insurance_amount'))
+
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">Insurance Amount</div>
+                        <div class="metric-value">₹ {insurance_amt:.2f} Cr</div>
+                    </div>
+                ''', unsafe_allow_html=True)
+            
+            with col3:
+                policies = safe_divide(summary.get('total_policies'))
+                st.markdown(f'''
+                    <div class="metric-card">
+                        <div class="metric-label">Insurance Policies</div>
+                        <div class="metric-value">{policies:.2f} Cr</div>
+                    </div>
+                ''', unsafe_allow_html=True)
+        
+        else:
+            st.warning("No data available for the selected year and quarter.")
+
         
-        else:  # Pincode level
-            # Use top data for pincode level, aggregate to state
-            if heatmap_data_type == "Transactions":
-                heatmap_df = analytics.get_top_transaction_pincode_wise_data(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    if heatmap_category != "All Categories":
-                        heatmap_df = heatmap_df[heatmap_df['trans_type'] == heatmap_category]
-                    
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'total_trans_amount': 'sum',
-                        'total_trans_count': 'sum'
-                    })
-                    heatmap_data.rename(columns={'total_trans_amount': 'value', 'total_trans_count': 'count'}, inplace=True)
-                    metric_name = "Transaction Amount"
-                    metric_unit = "₹ Cr"
-                    count_label = "Transactions"
+        st.markdown("<br>", unsafe_allow_html=True)
+
+    with top_states_area:
+        # Top performing states
+        st.markdown("### Top Performing States")
+        st.markdown('<p class="subtitle">Top 10 Aggregated Transaction Table</p>', unsafe_allow_html=True)
+        top_states_df = results['top_states']
+        
+        col1, col2 = st.columns([2, 1])
+        
+        if not top_states_df.empty:
+            col1, col2 = st.columns([2, 1])
             
-            elif heatmap_data_type == "Users":
-                heatmap_df = analytics.get_top_user_pincode_wise_data(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'total_registered_users': 'sum'
-                    })
-                    heatmap_data.rename(columns={'total_registered_users': 'value'}, inplace=True)
-                    heatmap_data['count'] = 0  # No count for users at pincode level
-                    metric_name = "Registered Users"
-                    metric_unit = "Cr"
-                    count_label = "Users"
+            with col1:
+                fig = plot_top_states_bar(top_states_df, top_n=10)
+                st.plotly_chart(fig, use_container_width=True)
             
-            else:  # Insurance
-                heatmap_df = analytics.get_top_insurance_pincode_wise_data(heatmap_year, heatmap_quarter)
-                if not heatmap_df.empty:
-                    if heatmap_category != "All Categories":
-                        heatmap_df = heatmap_df[heatmap_df['insurance_type'] == heatmap_category]
-                    
-                    heatmap_data = heatmap_df.groupby('state', as_index=False).agg({
-                        'total_insurance_amount': 'sum',
-                        'total_insurance_count': 'sum'
-                    })
-                    heatmap_data.rename(columns={'total_insurance_amount': 'value', 'total_insurance_count': 'count'}, inplace=True)
-                    metric_name = "Insurance Amount"
-                    metric_unit = "₹ Cr"
-                    count_label = "Policies"
+            with col2:
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.dataframe(
+                    top_states_df[['state', 'trans_amount', 'trans_count']].head(10),
+                    use_container_width=True,
+                    height=400
+                )
+        else:
+            st.info("No transaction data available for the selected period.")
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+
+    # Heatmap rows were rolled up in the database: one row per state and district at the District level, one per state otherwise
+    try:
+        metric_name, metric_unit, count_label = HEATMAP_METRICS[heatmap_data_type]
+        if heatmap_data_type == "Users" and heatmap_data_level == "Pincode":
+            count_label = "Users"  # No count for users at pincode level
+
+        if heatmap_error:
+            raise heatmap_error
+        heatmap_data = results['heatmap']
         
         # Display heatmap and summary cards
         if not heatmap_data.empty:
             # Map state names
             heatmap_data = map_state_names(heatmap_data.copy())
             
+            # District rows are ranked by district, everything else by state
+            region = 'district' if heatmap_data_level == "District" else 'state'
+            
             # Calculate summary metrics
             total_value = heatmap_data['value'].sum()
             avg_value = heatmap_data['value'].mean()
-            top_state = heatmap_data.loc[heatmap_data['value'].idxmax(), 'state'] if len(heatmap_data) > 0 else "N/A"
+            top_state = heatmap_data.loc[heatmap_data['value'].idxmax(), region] if len(heatmap_data) > 0 else "N/A"
             top_state_value = heatmap_data['value'].max() if len(heatmap_data) > 0 else 0
             total_count = heatmap_data['count'].sum() if 'count' in heatmap_data.columns else 0
             num_regions = len(heatmap_data)
@@ -748,7 +739,12 @@ with tabs[0]:
             
             with col1:
                 # Create choropleth map
-                fig = plot_india_heatmap(heatmap_data, metric_name, metric_unit, heatmap_year, heatmap_quarter, heatmap_data_level)
+                if heatmap_data_level == "District":
+                    if india_districts_geojson() is None:
+                        st.warning("District boundaries are not built, so the map shows state totals. Build them with python -m src.etl.build_geojson --boundaries districts")
+                    fig = plot_india_district_heatmap(heatmap_data, metric_name, metric_unit, heatmap_year, heatmap_quarter)
+                else:
+                    fig = plot_india_heatmap(heatmap_data, metric_name, metric_unit, heatmap_year, heatmap_quarter, heatmap_data_level)
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
@@ -793,7 +789,7 @@ with tabs[0]:
                 # Summary Card 3: Top State
                 st.markdown(f'''
                     <div class="metric-card">
-                        <div class="metric-label">Top Performing State</div>
+                        <div class="metric-label">Top Performing {region.title()}</div>
                         <div class="metric-value" style="font-size: 1.3rem;">{top_state}</div>
                         <div class="metric-label" style="margin-top: 8px;">{metric_unit} {top_state_value_cr:.2f}</div>
                     </div>
@@ -829,13 +825,20 @@ with tabs[0]:
     
 
 # ==================== TRANSACTIONS TAB ====================
-with tabs[1]:
+def render_transactions():
     st.markdown('<h2 class="section-header">Transaction Analytics</h2>', unsafe_allow_html=True)
+    panel = {
+        'trans_types': ('get_transaction_type_distribution', (year_val, quarter_val)),
+        'top_states': ('get_top_states_by_transaction_amount', (year_val, quarter_val), {'limit': 50})
+    }
+    if year_val:
+        panel['quarterly'] = ('get_quarterly_trends', (year_val,))
+    results = run_panel(panel)
     
     # Transaction type distribution
     st.markdown("### Transaction Type Distribution")
     st.markdown('<p class="subtitle">Aggregated Transaction Distribution</p>', unsafe_allow_html=True)
-    trans_type_df = analytics.get_transaction_type_distribution(year_val, quarter_val)
+    trans_type_df = results['trans_types']
     
     if not trans_type_df.empty:
         col1, col2 = st.columns(2)
@@ -852,7 +855,7 @@ with tabs[1]:
     if year_val:
         st.markdown("### Quarterly Trends")
         st.markdown('<p class="subtitle">Quarterly Aggregated Transaction</p>', unsafe_allow_html=True)
-        quarterly_df = analytics.get_quarterly_trends(year_val)
+        quarterly_df = results['quarterly']
         
         if not quarterly_df.empty:
             fig = plot_quarterly_comparison(quarterly_df)
@@ -860,7 +863,7 @@ with tabs[1]:
     
     # State-wise map
     st.markdown("### State-wise Transaction Map")
-    top_states = analytics.get_top_states_by_transaction_amount(year_val, quarter_val, limit=50)
+    top_states = results['top_states']
     
     if not top_states.empty:
         top_states.rename(columns={'trans_amount': 'trans_amount'}, inplace=True)
@@ -874,8 +877,9 @@ with tabs[1]:
                                    ["All"] + list(top_states['state'].unique()) if not top_states.empty else ["All"])
     
     if selected_state != "All":
-        district_df = analytics.get_top_districts_by_transaction(
-            selected_state.lower().replace(' ', '-').replace('&', '&'),
+        district_df = run_query(
+            'get_top_districts_by_transaction',
+            STATE_SLUGS.get(selected_state, selected_state.lower().replace(' ', '-')),
             year_val,
             limit=10
         )
@@ -892,13 +896,18 @@ with tabs[1]:
                 st.dataframe(district_df, use_container_width=True, height=400)
 
 # ==================== USERS TAB ====================
-with tabs[2]:
+def render_users():
     st.markdown('<h2 class="section-header">User Analytics</h2>', unsafe_allow_html=True)
+    results = run_panel({
+        'engagement': ('get_user_engagement_metrics', (year_val, quarter_val)),
+        'devices': ('get_device_brand_popularity', (year_val,)),
+        'growth': ('get_user_growth_rate', ())
+    })
     
     # User engagement metrics
     st.markdown("### User Engagement")
     st.markdown('<p class="subtitle">Aggeregated User Engagement</p>', unsafe_allow_html=True)
-    engagement_df = analytics.get_user_engagement_metrics(year_val, quarter_val)
+    engagement_df = results['engagement']
     
     if not engagement_df.empty:
         col1, col2, col3 = st.columns(3)
@@ -937,7 +946,7 @@ with tabs[2]:
     # Device brands
     st.markdown("### Device Brand Analysis")
     st.markdown('<p class="subtitle">Aggeregated User Devices</p>', unsafe_allow_html=True)
-    device_df = analytics.get_device_brand_popularity(year_val)
+    device_df = results['devices']
     
     if not device_df.empty:
         col1, col2 = st.columns([2, 1])
@@ -952,19 +961,19 @@ with tabs[2]:
     # User growth
     st.markdown("### User Growth Trend")
     st.markdown('<p class="subtitle">Aggeregated User Growth</p>', unsafe_allow_html=True)
-    growth_df = analytics.get_user_growth_rate()
+    growth_df = results['growth']
     
     if not growth_df.empty:
         fig = plot_user_growth(growth_df)
         st.plotly_chart(fig, use_container_width=True)
 
 # ==================== INSURANCE TAB ====================
-with tabs[3]:
+def render_insurance():
     st.markdown('<h2 class="section-header">Insurance Analytics</h2>', unsafe_allow_html=True)
     st.markdown('<p class="subtitle">Aggeregated Insurance Adoption</p>', unsafe_allow_html=True)
     
     # Insurance metrics
-    insurance_df = analytics.get_insurance_adoption_by_state(year_val, quarter_val)
+    insurance_df = run_query('get_insurance_adoption_by_state', year_val, quarter_val)
     
     if not insurance_df.empty:
         col1, col2, col3 = st.columns(3)
@@ -1004,9 +1013,100 @@ with tabs[3]:
         st.plotly_chart(fig, use_container_width=True)
     
 # ==================== RAW DATA TAB ====================
-with tabs[4]:
+def render_table_page(table_name, title, sort_by=None, descending=False):
+    st.markdown(f"### {title}")
+    columns, _ = table_columns(table_name)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        state = st.selectbox(
+            "State", ["All"] + (options['states'] or sorted(STATE_MAPPING)),
+            format_func=lambda s: STATE_MAPPING.get(s, s), key="raw_state"
+        )
+    with col2:
+        sort_by = st.selectbox(
+            "Sort By", list(columns), index=list(columns).index(sort_by) if sort_by else 0,
+            key=f"raw_sort_by_{table_name}"
+        )
+    with col3:
+        order = st.selectbox("Order", ["Ascending", "Descending"], index=int(descending), key=f"raw_order_{table_name}")
+    with col4:
+        page_size = st.selectbox("Rows per Page", [50, 100, 500], index=1, key="raw_page_size")
+
+    state_val = None if state == "All" else state
+    descending = order == "Descending"
+
+    # Keys of the pages visited so far; any change of table, filter or order starts over at page 1
+    view = (table_name, year_val, quarter_val, state_val, sort_by, descending, page_size)
+    if st.session_state.get('raw_view') != view:
+        st.session_state['raw_view'] = view
+        st.session_state['raw_pages'] = [None]
+    pages = st.session_state['raw_pages']
+
+    # Counted from the metadata when the ETL has written it for this table
+    version = data_version()
+    total_rows = catalog_rows(catalog, table_name, year_val, quarter_val, state_val)
+    if total_rows is None:
+        total_rows = cached_count(version, table_name, year_val, quarter_val, state_val)
+    df, next_key = cached_page(
+        version, table_name, year_val, quarter_val, state_val,
+        sort_by=sort_by, descending=descending, after=pages[-1], page_size=page_size
+    )
+    page_count = max(1, -(-total_rows // page_size))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f'''
+            <div class="metric-card">
+                <div class="metric-label">Total Records</div>
+                <div class="metric-value">{total_rows:,}</div>
+            </div>
+        ''', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f'''
+            <div class="metric-card">
+                <div class="metric-label">Total Columns</div>
+                <div class="metric-value">{len(columns)}</div>
+            </div>
+        ''', unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f'''
+            <div class="metric-card">
+                <div class="metric-label">Page</div>
+                <div class="metric-value">{len(pages)} / {page_count}</div>
+            </div>
+        ''', unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    if df.empty:
+        st.warning("No data available for selected filters.")
+    else:
+        st.dataframe(df, use_container_width=True, height=500, hide_index=True)
+
+    col1, col2, _ = st.columns([1, 1, 6])
+    with col1:
+        st.button("Previous", on_click=pages.pop, disabled=len(pages) == 1, key="raw_previous")
+    with col2:
+        st.button(
+            "Next", on_click=pages.append, args=(next_key,),
+            disabled=len(pages) >= page_count or next_key is None, key="raw_next"
+        )
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+def render_raw_data():
     st.markdown('<h2 class="section-header">Raw Data Explorer</h2>', unsafe_allow_html=True)
     
+    # The snapshot only holds query results; paging through the tables still needs the database
+    if DASHBOARD_SOURCE == 'snapshot' and not st.session_state.get('raw_connected'):
+        connected, connection_message = check_backend(get_shared_engine())
+        if not connected:
+            st.warning(f"The Raw Data Explorer reads the tables directly. {connection_message}")
+            return
+        st.session_state['raw_connected'] = True
+    
     st.info("Explore raw data from database tables")
 
     col1, col2, col3 = st.columns(3)
@@ -1032,127 +1132,60 @@ with tabs[4]:
                 ["Master Data", "District Level", "Pincode Level"]
             )
     
+    # Raw tables are paged on the server; only the current page is fetched
     if data_category == "Aggregated Data":
         if data_type == "Transactions":
-            df = get_aggr_transaction(year_val, quarter_val)
-            st.markdown("### Aggregated Transaction Data")
+            return render_table_page('aggr_transaction', "Aggregated Transaction Data")
         elif data_type == "Users":
-            df = get_aggr_user(year_val, quarter_val)
-            st.markdown("### Aggregated User Data")
+            return render_table_page('aggr_user', "Aggregated User Data")
         else:
-            df = get_aggr_insurance(year_val, quarter_val)
-            st.markdown("### Aggregated Insurance Data")
+            return render_table_page('aggr_insurance', "Aggregated Insurance Data")
     
     elif data_category == "Map Level Data":
         if data_type == "Transactions":
-            df = get_map_transaction(year_val, quarter_val)
-            st.markdown("### Map Transaction Data")
+            return render_table_page('map_transaction', "Map Transaction Data")
         elif data_type == "Users":
-            df = get_map_user(year_val, quarter_val)
-            st.markdown("### Map User Data")
+            return render_table_page('map_user', "Map User Data")
         else:
-            df = get_map_insurance(year_val, quarter_val)
-            st.markdown("### Map Insurance Data")
+            return render_table_page('map_insurance', "Map Insurance Data")
     
     else:  # Top Level Data
         if data_level == "Master Data":
             if data_type == "Transactions":
-                df = get_top_transaction(year_val, quarter_val)
-                st.markdown("### Top Transaction Data - Master Level")
+                return render_table_page('top_transaction', "Top Transaction Data - Master Level")
             elif data_type == "Users":
-                df = get_top_user(year_val, quarter_val)
-                st.markdown("### Top User Data - Master Level")
+                return render_table_page('top_user', "Top User Data - Master Level")
             else:
-                df = get_top_insurance(year_val, quarter_val)
-                st.markdown("### Top Insurance Data - Master Level")
-
-        elif data_level == "District Level":
-            if data_type == "Transactions":
-                df = analytics.get_top_transaction_districts_wise_data(year_val, quarter_val)
-                st.markdown("### Top Transaction Data - District Level")
-            elif data_type == "Users":
-                df = analytics.get_top_user_districts_wise_data(year_val, quarter_val)
-                st.markdown("### Top User Data - District Level")
-            else:
-                df = analytics.get_top_insurance_districts_wise_data(year_val, quarter_val)
-                st.markdown("### Top Insurance Data - District Level")
-        
-        else:  # Pincode Level
-            if data_type == "Transactions":
-                df = analytics.get_top_transaction_pincode_wise_data(year_val, quarter_val)
-                st.markdown("### Top Transaction Data - Pincode Level")
-            elif data_type == "Users":
-                df = analytics.get_top_user_pincode_wise_data(year_val, quarter_val)
-                st.markdown("### Top User Data - Pincode Level")
-            else:
-                df = analytics.get_top_insurance_pincode_wise_data(year_val, quarter_val)
-                st.markdown("### Top Insurance Data - Pincode Level")
-    
-    if not df.empty:
-        # Show stats
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Total Records</div>
-                    <div class="metric-value">{len(df):,}</div>
-                </div>
-            ''', unsafe_allow_html=True)
-
-        with col2:
-            st.markdown(f'''
-                <div class="metric-card">
-                    <div class="metric-label">Total Columns</div>
-                    <div class="metric-value">{len(df.columns)}</div>
-                </div>
-            ''', unsafe_allow_html=True)
-
-        with col3:
-            # Show additional metric based on data type
-            if data_type == "Transactions" and 'total_trans_amount' in df.columns:
-                total_amount = df['total_trans_amount'].sum() / 10000000
-                st.markdown(f'''
-                    <div class="metric-card">
-                        <div class="metric-label">Total Amount</div>
-                        <div class="metric-value">₹ {total_amount:.2f} Cr</div>
-                    </div>
-                ''', unsafe_allow_html=True)
-            elif data_type == "Users" and 'total_registered_users' in df.columns:
-                total_users = df['total_registered_users'].sum() / 10000000
-                st.markdown(f'''
-                    <div class="metric-card">
-                        <div class="metric-label">Total Users</div>
-                        <div class="metric-value">{total_users:.2f} Cr</div>
-                    </div>
-                ''', unsafe_allow_html=True)
-            elif data_type == "Insurance" and 'total_insurance_amount' in df.columns:
-                total_ins = df['total_insurance_amount'].sum() / 10000000
-                st.markdown(f'''
-                    <div class="metric-card">
-                        <div class="metric-label">Total Insurance</div>
-                        <div class="metric-value">₹ {total_ins:.2f} Cr</div>
-                    </div>
-                ''', unsafe_allow_html=True)
-        
-        # Show data
-        st.markdown("<br>", unsafe_allow_html=True)        
-        st.dataframe(df, use_container_width=True, height=500)
-
-    else:
-        st.warning("No data available for selected filters.")
-
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    # ==================== INSIGHTS TAB ====================
-with tabs[5]:
+                return render_table_page('top_insurance', "Top Insurance Data - Master Level")
+
+        # Summed per district or pincode in SQL and paged by the largest totals first
+        table_name, label, sort_by = {
+            "Transactions": ('top_transaction', "Transaction", 'total_trans_amount'),
+            "Users": ('top_user', "User", 'total_registered_users'),
+            "Insurance": ('top_insurance', "Insurance", 'total_insurance_amount')
+        }[data_type]
+        if data_level == "District Level":
+            return render_table_page(f"{table_name}_district", f"Top {label} Data - District Level", sort_by, True)
+        return render_table_page(f"{table_name}_pincode", f"Top {label} Data - Pincode Level", sort_by, True)
+
+# ==================== INSIGHTS TAB ====================
+def render_insights():
     st.markdown('<h2 class="section-header">Key Insights & Recommendations</h2>', unsafe_allow_html=True)
     
-    # Get data safely
-    summary_df_insights = analytics.get_executive_summary(year_val, quarter_val)
+    # Get data safely; the panels are independent, so fetch them all at once
+    results = run_panel({
+        'summary': ('get_executive_summary', (year_val, quarter_val)),
+        'top_states': ('get_top_states_by_transaction_amount', (year_val, quarter_val), {'limit': 5}),
+        'growth': ('get_year_over_year_growth', ()),
+        'devices': ('get_device_brand_popularity', (year_val,)),
+        'engagement': ('get_user_engagement_metrics', (year_val, quarter_val)),
+        'insurance': ('get_insurance_adoption_by_state', (year_val, quarter_val))
+    })
+    summary_df_insights = results['summary']
     
     if not summary_df_insights.empty:
         summary = summary_df_insights.iloc[0]
-        top_states = analytics.get_top_states_by_transaction_amount(year_val, quarter_val, limit=5)
+        top_states = results['top_states']
 
         st.markdown("### Data-Driven Insights")
         
@@ -1160,7 +1193,7 @@ with tabs[5]:
         
         with col1:
             # Transaction insights
-            trans_growth = analytics.get_year_over_year_growth()
+            trans_growth = results['growth']
             if not trans_growth.empty and len(trans_growth) > 1:
                 latest_growth = trans_growth.iloc[-1]['amount_growth']
                 if pd.notna(latest_growth):
@@ -1169,20 +1202,20 @@ with tabs[5]:
                     st.info("Growth metrics will be available with more data")
             
             # Device insights
-            device_df = analytics.get_device_brand_popularity(year_val)
+            device_df = results['devices']
             if not device_df.empty:
                 top_brand = device_df.iloc[0]['device_brand']
                 st.info(f"Most Popular Device: **{top_brand}**")
         
         with col2:
             # User engagement insights
-            engagement_df = analytics.get_user_engagement_metrics(year_val, quarter_val)
+            engagement_df = results['engagement']
             if not engagement_df.empty and not engagement_df['avg_opens_per_user'].isna().all():
                 avg_engagement = engagement_df['avg_opens_per_user'].mean()
                 st.success(f"Avg User Engagement: **{avg_engagement:.1f}x** app opens per user")
             
             # Insurance insights
-            insurance_df = analytics.get_insurance_adoption_by_state(year_val, quarter_val)
+            insurance_df = results['insurance']
             if not insurance_df.empty:
                 total_ins = insurance_df['insur_amount'].sum() / 10000000
                 st.info(f"Total Insurance: **₹ {total_ins:.2f} Cr**")
@@ -1276,6 +1309,16 @@ with tabs[5]:
             </div>
         """, unsafe_allow_html=True)
 
+SECTIONS = {
+    "Overview": render_overview,
+    "Transactions": render_transactions,
+    "Users": render_users,
+    "Insurance": render_insurance,
+    "Raw Data": render_raw_data,
+    "Insights": render_insights
+}
+SECTIONS[selected_section]()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -1,5 +1,7 @@
 import os
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -8,9 +10,72 @@ DB_PASSWORD = os.environ.get("DB_PASSWORD")
 DB_HOST = os.environ.get("DB_HOST")
 DB_NAME = os.environ.get("DB_NAME")
 
-engine = create_engine(f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}")
+# Connection pool, shared by everything in the process (all Streamlit sessions included)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
 
-if engine:
-    print("Database connection successful!")
-else:
-    print(f"Database connection failed")
\ No newline at end of file
+# LOAD DATA LOCAL INFILE (ETL --load-method infile) has to be allowed by the client explicitly
+DB_LOCAL_INFILE = os.environ.get("DB_LOCAL_INFILE", "").lower() in ("1", "true", "yes")
+connect_args = {"allow_local_infile": True} if DB_LOCAL_INFILE else {}
+
+# Where the dashboard reads from: "mysql", or "duckdb" over Parquet files the ETL writes to PARQUET_PATH
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "mysql").lower()
+PARQUET_PATH = os.environ.get("PARQUET_PATH", "warehouse")
+
+# Where the dashboard's analytics come from: "live" queries, or the precomputed "snapshot" in SNAPSHOT_PATH
+DASHBOARD_SOURCE = os.environ.get("DASHBOARD_SOURCE", "live").lower()
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "snapshot")
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide SQLAlchemy engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}",
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    pool_recycle=DB_POOL_RECYCLE,
+                    pool_pre_ping=DB_POOL_PRE_PING,
+                    connect_args=connect_args
+                )
+    return _engine
+
+
+def dispose_engine(close=True):
+    """Drop the engine and its pool; close=False leaves the connections open.
+
+    A forked child passes close=False: its copies of the parent's pooled
+    connections share their sockets with the parent, which still uses them.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose(close=close)
+            _engine = None
+
+
+def check_connection(engine=None):
+    """Open a real connection and run SELECT 1. Returns (ok, message)"""
+    try:
+        with (engine or get_engine()).connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True, "Database connection successful!"
+    except SQLAlchemyError as e:
+        return False, f"Database connection failed: {e}"
+
+
+def __getattr__(name):
+    # Keeps `from src.config import engine` working without creating the engine at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
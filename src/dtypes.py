@@ -0,0 +1,28 @@
+import pandas as pd
+
+# Shared in-memory dtypes of the Pulse columns, applied by the ETL buffer, the
+# query layer and therefore every DataFrame the app caches
+
+# Low-cardinality text columns
+CATEGORY_COLUMNS = ('state', 'district', 'pincode', 'trans_type', 'insurance_type', 'device_brand')
+
+# Ranges are known: years fit int16 and quarters int8
+INTEGER_COLUMNS = {'year': 'int16', 'quarter': 'int8'}
+
+# float32 keeps about 7 significant digits. That is plenty for shares, but rupee
+# amounts and counts run into the billions and stay 64-bit
+FLOAT32_COLUMNS = ('device_percentage', 'avg_percentage')
+
+
+def compact_dtypes(df):
+    """Apply the shared dtypes to the known columns of a DataFrame, leaving Arrow-backed columns alone"""
+    for column in df.columns:
+        series = df[column]
+        if column in CATEGORY_COLUMNS and series.dtype == object:
+            df[column] = series.astype('category')
+        elif column in INTEGER_COLUMNS and pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.ArrowDtype):
+            df[column] = series.astype(INTEGER_COLUMNS[column])
+        elif column in FLOAT32_COLUMNS and series.dtype == 'float64':
+            df[column] = series.astype('float32')
+    return df
+
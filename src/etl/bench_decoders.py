@@ -0,0 +1,63 @@
+import os
+import time
+import argparse
+from src.etl.ingest import list_quarter_files
+from src.etl.extract import BASE_PATH, extract_file
+from src.etl.decoders import available_decoders
+from src.etl.datasets import TOP
+
+
+def bench(func, items, repeat):
+    """Best wall time over `repeat` runs of func(item) for every item"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON decoders on the Pulse top-level files")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per decoder, the best one is reported")
+    parser.add_argument('--base-path', default=BASE_PATH, help="Directory containing the Pulse data")
+    args = parser.parse_args()
+
+    tasks = {
+        table_name: list_quarter_files(os.path.join(args.base_path, spec['path']))
+        for table_name, spec in TOP.items()
+    }
+    paths = [task[3] for table_tasks in tasks.values() for task in table_tasks]
+
+    # Decode-only timings run on bytes already in memory so disk I/O does not hide the parser cost
+    blobs = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+    megabytes = sum(len(blob) for blob in blobs) / 1e6
+
+    print(f"{len(paths)} files, {megabytes:.1f} MB under {os.path.join(args.base_path, 'top')}\n")
+    print(f"{'decoder':<10} {'decode s':>9} {'MB/s':>8} {'files/s':>9} {'extract s':>10} {'speedup':>8}")
+
+    baseline = None
+    for name, decode in reversed(list(available_decoders().items())):
+        decode_seconds = bench(decode, blobs, args.repeat)
+
+        # End to end: read, decode and extract records for every top_* table
+        def extract_all(_):
+            for table_name, spec in TOP.items():
+                for task in tasks[table_name]:
+                    for _record in extract_file(spec, name, task):
+                        pass
+        extract_seconds = bench(extract_all, [None], args.repeat)
+
+        baseline = baseline or extract_seconds
+        print(
+            f"{name:<10} {decode_seconds:>9.3f} {megabytes / decode_seconds:>8.1f} "
+            f"{len(blobs) / decode_seconds:>9.0f} {extract_seconds:>10.3f} {baseline / extract_seconds:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
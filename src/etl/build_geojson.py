@@ -0,0 +1,233 @@
+import os
+import json
+import argparse
+import urllib.request
+from src.sql.backend import read_sql
+from src.geo import SOURCE_URL, OUTPUT_DIR, DETAIL_LEVELS, district_key
+
+STATE_PROPERTY = 'ST_NM'
+DISTRICT_PROPERTY = 'DISTRICT'
+
+# Default district boundaries (2011 census districts from GADM) and the properties
+# holding their state and district names. They predate Telangana, Ladakh and every
+# district created since, so pass --source for current boundaries
+DISTRICT_SOURCE_URL = "https://raw.githubusercontent.com/geohacker/india/master/district/india_district.geojson"
+DISTRICT_SOURCE_PROPERTIES = ('NAME_1', 'NAME_2')
+
+
+# ============ SHARED ARCS ============
+
+def feature_rings(geometry):
+    """Rings of a Polygon or MultiPolygon as lists of (x, y) tuples, grouped by polygon"""
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    return [[[tuple(point[:2]) for point in ring] for ring in polygon] for polygon in polygons]
+
+
+def find_junctions(rings):
+    """Points where a border between two features starts or ends.
+
+    A point is a junction when its neighbours differ between the rings it
+    appears in; a border shared by two states has the same neighbours on both
+    sides, just in the opposite order.
+    """
+    neighbours = {}
+    junctions = set()
+    for ring in rings:
+        points = ring[:-1]
+        for i, point in enumerate(points):
+            pair = frozenset((points[i - 1], points[(i + 1) % len(points)]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def split_ring(ring, junctions):
+    """Cut a closed ring into arcs that start and end at junctions"""
+    points = ring[:-1]
+    cuts = [i for i, point in enumerate(points) if point in junctions]
+    if not cuts:
+        # A ring without junctions (an island, or an enclave and the hole around it)
+        # starts at its smallest point, so both copies of an enclave simplify alike
+        start = points.index(min(points))
+        return [points[start:] + points[:start] + [points[start]]]
+    # Rotate so the ring starts at a junction, then cut at every junction
+    start = cuts[0]
+    points = points[start:] + points[:start] + [points[start]]
+    arcs = []
+    arc = [points[0]]
+    for point in points[1:]:
+        arc.append(point)
+        if point in junctions:
+            arcs.append(arc)
+            arc = [point]
+    return arcs
+
+
+def douglas_peucker(points, tolerance):
+    """Simplify a line, always keeping both ends"""
+    if len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = (dx * dx + dy * dy) ** 0.5
+        farthest, index = 0.0, None
+        for i in range(first + 1, last):
+            x, y = points[i]
+            if length:
+                distance = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / length
+            else:
+                distance = ((x - x1) ** 2 + (y - y1) ** 2) ** 0.5
+            if distance > farthest:
+                farthest, index = distance, i
+        if index is not None and farthest > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_arc(arc, tolerance, simplified):
+    """Simplify an arc once and reuse the result for the neighbour sharing it, in its direction"""
+    key = tuple(arc)
+    reverse_key = key[::-1]
+    if key in simplified:
+        return simplified[key]
+    if reverse_key in simplified:
+        return simplified[reverse_key][::-1]
+    result = douglas_peucker(arc, tolerance)
+    simplified[key] = result
+    return result
+
+
+# ============ BUILD ============
+
+def simplify_geojson(geojson, tolerance, precision, properties=(STATE_PROPERTY,)):
+    """Topology-preserving simplification: shared borders are simplified once, so neighbours still meet"""
+    features = geojson['features']
+    polygons_by_feature = [feature_rings(feature['geometry']) for feature in features]
+    all_rings = [ring for polygons in polygons_by_feature for polygon in polygons for ring in polygon]
+    junctions = find_junctions(all_rings)
+    simplified = {}
+
+    output = []
+    for feature, polygons in zip(features, polygons_by_feature):
+        new_polygons = []
+        for polygon in polygons:
+            new_rings = []
+            for ring in polygon:
+                points = []
+                for arc in split_ring(ring, junctions):
+                    part = simplify_arc(arc, tolerance, simplified)
+                    points.extend(part if not points else part[1:])
+                points = [[round(x, precision), round(y, precision)] for x, y in points]
+                # Rings that collapse below a triangle are dropped, except a polygon's outer ring
+                if len(points) >= 4 or not new_rings:
+                    new_rings.append(points)
+            new_polygons.append(new_rings)
+
+        # Keep polygons whose outer ring survived; always keep the largest one
+        kept = [polygon for polygon in new_polygons if len(polygon[0]) >= 4] or \
+            [max(new_polygons, key=lambda polygon: len(polygon[0]))]
+        geometry = (
+            {'type': 'Polygon', 'coordinates': kept[0]} if len(kept) == 1
+            else {'type': 'MultiPolygon', 'coordinates': kept}
+        )
+        output.append({
+            'type': 'Feature',
+            'properties': {name: feature['properties'][name] for name in properties},
+            'geometry': geometry
+        })
+    return {'type': 'FeatureCollection', 'features': output}
+
+
+def point_count(geojson):
+    """Number of coordinates in a FeatureCollection"""
+    return sum(
+        len(ring)
+        for feature in geojson['features']
+        for polygon in feature_rings(feature['geometry'])
+        for ring in polygon
+    )
+
+
+def add_district_keys(geojson, state_property, district_property):
+    """Rename the name properties to ST_NM/DISTRICT and add each feature's district_key()"""
+    for feature in geojson['features']:
+        properties = feature['properties']
+        state, district = properties.pop(state_property), properties.pop(district_property)
+        properties.update({
+            STATE_PROPERTY: state,
+            DISTRICT_PROPERTY: district,
+            'key': district_key(state, district)
+        })
+    return geojson
+
+
+def check_districts(geojson):
+    """List map_* districts without a boundary, to extend STATE_ALIASES or fix the source"""
+    keys = {feature['properties']['key'] for feature in geojson['features']}
+    districts = read_sql("SELECT DISTINCT state, district FROM map_transaction")
+    missing = [
+        f"{state} / {district}" for state, district in zip(districts['state'], districts['district'])
+        if district_key(state, district) not in keys
+    ]
+    print(f"{len(districts) - len(missing)} of {len(districts)} districts in map_transaction have a boundary")
+    for name in missing:
+        print(f"  no boundary: {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the simplified India boundary files used by the maps")
+    parser.add_argument('--boundaries', choices=['states', 'districts'], default='states')
+    parser.add_argument('--source', help="GeoJSON file or URL (defaults to SOURCE_URL or DISTRICT_SOURCE_URL)")
+    parser.add_argument('--state-property', help="Feature property holding the state name")
+    parser.add_argument('--district-property', help="Feature property holding the district name")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Where the india_<boundaries>_<detail>.geojson files go")
+    parser.add_argument('--levels', nargs='+', choices=list(DETAIL_LEVELS), default=list(DETAIL_LEVELS))
+    parser.add_argument('--check', action='store_true', help="Report districts in the database without a boundary")
+    args = parser.parse_args()
+
+    source_path = args.source or (SOURCE_URL if args.boundaries == 'states' else DISTRICT_SOURCE_URL)
+    if source_path == DISTRICT_SOURCE_URL:
+        default_properties = DISTRICT_SOURCE_PROPERTIES
+    else:
+        default_properties = (STATE_PROPERTY, DISTRICT_PROPERTY)
+    state_property = args.state_property or default_properties[0]
+    district_property = args.district_property or default_properties[1]
+
+    if os.path.exists(source_path):
+        with open(source_path, encoding='utf-8') as f:
+            source = json.load(f)
+    else:
+        with urllib.request.urlopen(source_path) as response:
+            source = json.load(response)
+
+    if args.boundaries == 'states':
+        properties = (state_property,)
+    else:
+        properties = (state_property, district_property)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"source: {len(source['features'])} features, {point_count(source):,} points")
+    for level in args.levels:
+        tolerance, precision = DETAIL_LEVELS[level]
+        geojson = simplify_geojson(source, tolerance, precision, properties)
+        if args.boundaries == 'districts':
+            geojson = add_district_keys(geojson, state_property, district_property)
+        path = os.path.join(args.output_dir, f"india_{args.boundaries}_{level}.geojson")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f, separators=(',', ':'))
+        print(f"{level}: {point_count(geojson):,} points, {os.path.getsize(path) / 1e3:,.0f} kB -> {path}")
+
+    if args.check and args.boundaries == 'districts':
+        check_districts(geojson)
+
+
+if __name__ == "__main__":
+    main()
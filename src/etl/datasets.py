@@ -0,0 +1,202 @@
+from src.etl.extract import field, key, const
+
+MISSING = '-- Missing Data --'
+
+# Each spec names the directory under pulse/data, the table columns and the
+# JSON sections to read. A section is a list or object of records, or with
+# 'single' one object read as a record. A new Pulse dataset only needs a new
+# entry here.
+
+# ========================== Aggregated ==========================
+AGGREGATED = {
+    'aggr_transaction': {
+        'label': "Transaction",
+        'path': 'aggregated/transaction/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'trans_type', 'trans_count', 'trans_amount'),
+        'sections': [
+            {
+                'records': 'transactionData',
+                'fields': {
+                    'trans_type': field('name'),
+                    'trans_count': field('paymentInstruments', 0, 'count', default=0),
+                    'trans_amount': field('paymentInstruments', 0, 'amount', default=0),
+                },
+            },
+        ],
+    },
+    # One summary row per state and quarter; the device breakdown goes to
+    # aggr_user_device so the totals are not repeated for every brand
+    'aggr_user': {
+        'label': "User",
+        'path': 'aggregated/user/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'registered_user', 'app_opens'),
+        'sections': [
+            {
+                'records': 'aggregated',
+                'single': True,
+                'fields': {
+                    'registered_user': field('registeredUsers', default=0),
+                    'app_opens': field('appOpens', default=0),
+                },
+            },
+        ],
+    },
+    'aggr_user_device': {
+        'label': "User device",
+        'path': 'aggregated/user/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'device_brand', 'device_count', 'device_percentage'),
+        'sections': [
+            {
+                'records': 'usersByDevice',
+                'fields': {
+                    'device_brand': field('brand', default=''),
+                    'device_count': field('count', default=0),
+                    'device_percentage': field('percentage', default=0.0),
+                },
+            },
+        ],
+    },
+    'aggr_insurance': {
+        'label': "Insurance",
+        'path': 'aggregated/insurance/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'insurance_type', 'insurance_count', 'insurance_amount'),
+        'sections': [
+            {
+                'records': 'transactionData',
+                'fields': {
+                    'insurance_type': field('name'),
+                    'insurance_count': field('paymentInstruments', 0, 'count', default=0),
+                    'insurance_amount': field('paymentInstruments', 0, 'amount', default=0),
+                },
+            },
+        ],
+    },
+}
+
+# ========================== Map (district hover) ==========================
+MAP = {
+    'map_transaction': {
+        'label': "Transaction",
+        'path': 'map/transaction/hover/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'district', 'trans_type', 'trans_count', 'trans_amount'),
+        'sections': [
+            {
+                'records': 'hoverDataList',
+                'fields': {
+                    'district': field('name'),
+                    'trans_type': field('metric', 0, 'type', default=''),
+                    'trans_count': field('metric', 0, 'count', default=0),
+                    'trans_amount': field('metric', 0, 'amount', default=0),
+                },
+            },
+        ],
+    },
+    'map_user': {
+        'label': "User",
+        'path': 'map/user/hover/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'district', 'registered_user', 'app_opens'),
+        'sections': [
+            {
+                'records': 'hoverData',
+                'fields': {
+                    'district': key(),
+                    'registered_user': field('registeredUsers', default=0),
+                    'app_opens': field('appOpens', default=0),
+                },
+            },
+        ],
+    },
+    'map_insurance': {
+        'label': "Insurance",
+        'path': 'map/insurance/hover/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'district', 'insurance_type', 'insurance_count', 'insurance_amount'),
+        'sections': [
+            {
+                'records': 'hoverDataList',
+                'fields': {
+                    'district': field('name'),
+                    'insurance_type': field('metric', 0, 'type', default=''),
+                    'insurance_count': field('metric', 0, 'count', default=0),
+                    'insurance_amount': field('metric', 0, 'amount', default=0),
+                },
+            },
+        ],
+    },
+}
+
+# ========================== Top (states / districts / pincodes) ==========================
+
+def top_sections(name_key, metric_fields, record_state=True):
+    """States, districts and pincodes sections of a top-level file.
+
+    State rows take their state from the record unless `record_state` is
+    False, in which case the state directory is used.
+    """
+    state_field = {'state': field(name_key, default='')} if record_state else {}
+    return [
+        {
+            'records': 'states',
+            'fields': {
+                **state_field,
+                'district': const(MISSING),
+                'pincode': const(MISSING),
+                **metric_fields,
+            },
+        },
+        {
+            'records': 'districts',
+            'fields': {
+                'district': field(name_key, default='', empty=MISSING),
+                'pincode': const(MISSING),
+                **metric_fields,
+            },
+        },
+        {
+            'records': 'pincodes',
+            'fields': {
+                'district': const(MISSING),
+                'pincode': field(name_key, default='', empty=MISSING),
+                **metric_fields,
+            },
+        },
+    ]
+
+
+TOP = {
+    'top_transaction': {
+        'label': "Transaction",
+        'path': 'top/transaction/country/india/state',
+        'columns': (
+            'year', 'quarter', 'state', 'district', 'pincode',
+            'trans_type', 'trans_count', 'trans_amount'
+        ),
+        'sections': top_sections('entityName', {
+            'trans_type': field('metric', 'type', default=''),
+            'trans_count': field('metric', 'count', default=0),
+            'trans_amount': field('metric', 'amount', default=0.0),
+        }),
+    },
+    'top_user': {
+        'label': "User",
+        'path': 'top/user/country/india/state',
+        'columns': ('year', 'quarter', 'state', 'district', 'pincode', 'registered_user'),
+        'sections': top_sections('name', {
+            'registered_user': field('registeredUsers', default=0),
+        }, record_state=False),
+    },
+    'top_insurance': {
+        'label': "Insurance",
+        'path': 'top/insurance/country/india/state',
+        'columns': (
+            'year', 'quarter', 'state', 'district', 'pincode',
+            'insurance_type', 'insurance_count', 'insurance_amount'
+        ),
+        'sections': top_sections('entityName', {
+            'insurance_type': field('metric', 'type', default=''),
+            'insurance_count': field('metric', 'count', default=0),
+            'insurance_amount': field('metric', 'amount', default=0.0),
+        }),
+    },
+}
+
+DATASETS = {**AGGREGATED, **MAP, **TOP}
@@ -0,0 +1,43 @@
+import os
+import json
+
+# Optional fast JSON parsers, used when installed (pip install orjson / pysimdjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+DECODER_NAMES = ('auto', 'orjson', 'simdjson', 'json')
+
+
+def available_decoders():
+    """Installed decoders, fastest first, as name -> function(bytes) -> object"""
+    decoders = {}
+    if orjson is not None:
+        decoders['orjson'] = orjson.loads
+    if simdjson is not None:
+        decoders['simdjson'] = simdjson.loads
+    decoders['json'] = json.loads
+    return decoders
+
+
+def get_decoder(name=None):
+    """Decoder function by name; 'auto' picks the fastest installed one"""
+    name = name or os.environ.get('ETL_JSON_DECODER', 'auto')
+    decoders = available_decoders()
+    if name == 'auto':
+        return next(iter(decoders.values()))
+    if name not in decoders:
+        raise ValueError(f"JSON decoder '{name}' is not installed (available: {', '.join(decoders)})")
+    return decoders[name]
+
+
+def read_json(file_path, decode=json.loads):
+    """Read a file as bytes and decode it"""
+    with open(file_path, 'rb') as f:
+        return decode(f.read())
@@ -0,0 +1,15 @@
+from dotenv import load_dotenv
+load_dotenv()
+from src.etl.stores import get_store
+from src.etl.ingest import get_parser
+from src.etl.extract import load_tables
+from src.etl.datasets import DATASETS
+
+
+def main():
+    args = get_parser("Load every PhonePe Pulse dataset into MySQL").parse_args()
+    load_tables(get_store(), DATASETS, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+from src.etl.stores import get_store
+from src.etl.metadata import METADATA_TABLE, category_column
+from src.sql.backend import read_sql, table_names
+from src.sql.schema import TABLES
+from src.sql.cache import mark_data_changed
+from src.config import dispose_engine
+
+
+def table_counts(table_name):
+    """Metadata rows of a loaded table, counted with one GROUP BY"""
+    category = category_column(table_name) or "''"
+    df = read_sql(f"""
+        SELECT year, quarter, state, {category} AS category, COUNT(*) AS row_count
+        FROM {table_name}
+        GROUP BY year, quarter, state, {category}
+    """)
+    df.insert(0, 'table_name', table_name)
+    return df.astype({'year': 'int64', 'quarter': 'int64', 'state': str, 'category': str, 'row_count': 'int64'})
+
+
+def main():
+    argparse.ArgumentParser(
+        description=f"Rebuild {METADATA_TABLE} from the loaded tables; the ETL keeps it current after that"
+    ).parse_args()
+    store = get_store()
+    loaded = table_names()
+    for table_name in TABLES:
+        if table_name not in loaded:
+            continue
+        counts = table_counts(table_name)
+        with store.engine.begin() as conn:
+            store.write_metadata(conn, table_name, None, counts)
+        print(f"{table_name}: {len(counts):,} metadata rows for {counts['row_count'].sum():,} table rows")
+    mark_data_changed()
+    dispose_engine()
+    print("Metadata rebuilt successfully.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import inspect
+from src.config import get_engine, dispose_engine
+from src.sql.rollups import ROLLUPS, rollups_for, build_rollup
+from src.sql.cache import mark_data_changed
+
+
+def refresh_rollups(engine, source, partitions=None):
+    """Rebuild the rollups of a source table, or only the given (year, quarter) partitions"""
+    names = rollups_for(source)
+    if not names:
+        return
+    inspector = inspect(engine)
+    if not inspector.has_table(source):
+        print(f"{source}: table not loaded yet, skipping {len(names)} rollups")
+        return
+    if partitions == [] and all(inspector.has_table(name) for name in names):
+        return
+
+    with engine.begin() as conn:
+        for name in names:
+            build_rollup(conn, name, partitions)
+
+    scope = "all partitions" if partitions is None else f"{len(partitions)} partitions"
+    print(f"{source}: updated {len(names)} rollups ({scope})")
+
+
+def main():
+    argparse.ArgumentParser(description="Rebuild every rollup table from the loaded Pulse tables").parse_args()
+    engine = get_engine()
+    for source in dict.fromkeys(rollup['source'] for rollup in ROLLUPS.values()):
+        refresh_rollups(engine, source)
+    mark_data_changed()
+    dispose_engine()
+    print("Rollup tables rebuilt successfully.")
+
+
+if __name__ == "__main__":
+    main()
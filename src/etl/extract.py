@@ -0,0 +1,132 @@
+import os
+from functools import partial
+from src.etl.ingest import list_quarter_files, load_dataset
+from src.etl.decoders import get_decoder, read_json
+from src.etl.etl_rollup import refresh_rollups
+from src.sql.cache import mark_data_changed
+from src.sql.snapshot import build_snapshot, missing_tables, snapshot_version
+from src.config import DASHBOARD_SOURCE, dispose_engine
+
+BASE_PATH = "pulse/data"
+
+
+# ============ FIELD SPECS ============
+# A dataset spec maps every output column to one of these. Year, quarter and
+# state default to the values parsed from the file path when not mapped.
+
+def field(*path, default=None, empty=None):
+    """Value at `path` inside each record; `empty` replaces '' and None"""
+    return ('record', path, default, empty)
+
+def key():
+    """Dict key of the record, for sections that are objects rather than lists"""
+    return ('key', (), None, None)
+
+def const(value):
+    """The same value for every record"""
+    return ('const', (), value, None)
+
+
+def lookup(obj, path, default):
+    """Follow a path of dict keys / list indexes, returning `default` when it breaks"""
+    for step in path:
+        try:
+            obj = obj[step]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return default if obj is None else obj
+
+
+# ============ EXTRACTION ENGINE ============
+
+def extract_file(spec, decoder, task):
+    """Yield one record tuple per entry of every section the spec reads from a file"""
+    state, year, quarter, file_path = task
+    data = read_json(file_path, get_decoder(decoder))['data']
+
+    context = {'year': const(year), 'quarter': const(quarter), 'state': const(state)}
+
+    for section in spec['sections']:
+        entries = data.get(section['records']) or []
+        if section.get('single'):
+            # The section is one object read as a single record
+            entries = [entries] if entries else []
+        fields = {**context, **section['fields']}
+
+        # Per-file values are resolved once; only record fields are looked up per entry
+        template = []
+        record_fields = []
+        key_index = None
+        for index, column in enumerate(spec['columns']):
+            kind, path, default, empty = fields[column]
+            if kind == 'const':
+                template.append(default)
+            elif kind == 'key':
+                template.append(None)
+                key_index = index
+            else:
+                template.append(None)
+                record_fields.append((index, path, default, empty))
+
+        items = entries.items() if isinstance(entries, dict) else ((None, entry) for entry in entries)
+
+        # Hot loop
+        for entry_key, record in items:
+            row = template.copy()
+            if key_index is not None:
+                row[key_index] = entry_key
+            for index, path, default, empty in record_fields:
+                value = lookup(record, path, default)
+                if empty is not None and value in ('', None):
+                    value = empty
+                row[index] = value
+            yield tuple(row)
+
+
+def scan(specs, base_path=BASE_PATH):
+    """List quarter files for each spec, scanning every directory only once"""
+    listings = {}
+    files = {}
+    for table_name, spec in specs.items():
+        if spec['path'] not in listings:
+            listings[spec['path']] = list_quarter_files(os.path.join(base_path, spec['path']))
+        files[table_name] = listings[spec['path']]
+    return files
+
+
+def load_tables(store, specs, args):
+    """Extract and incrementally load every dataset in `specs` into a store from src.etl.stores"""
+    ok, message = store.check()
+    print(message)
+    if not ok:
+        raise SystemExit(1)
+
+    files = scan(specs)
+    changed = False
+    for table_name, spec in specs.items():
+        partitions = load_dataset(
+            store, table_name, spec['columns'], files[table_name],
+            partial(extract_file, spec, args.json_decoder), args, f"{table_name} files"
+        )
+        # A reset table (partitions is None) has its rollups rebuilt whole, dropping partitions it no longer has
+        if store.rollups:
+            refresh_rollups(store.engine, table_name, partitions)
+        changed = changed or partitions is None or bool(partitions)
+        print(f"{spec['label']} data loaded successfully.")
+
+    # Dashboards drop cached query results older than this load; a run that
+    # changed nothing keeps them
+    if changed:
+        mark_data_changed()
+
+    # A dashboard serving the snapshot only sees new data once it is rebuilt. The
+    # snapshot reads every table, so it waits until the other ETL scripts have run.
+    if DASHBOARD_SOURCE == 'snapshot' and (changed or not snapshot_version()):
+        missing = missing_tables()
+        if missing:
+            print(f"Snapshot not built yet; waiting for {', '.join(missing)}")
+        else:
+            build_snapshot()
+
+    # The ETL scripts end here: close the pooled connections instead of leaving them to time out
+    dispose_engine()
@@ -0,0 +1,195 @@
+import os
+import time
+import argparse
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.etl.manifest import (
+    ensure_manifest, load_manifest, plan_changes, manifest_entry,
+    clear_partitions, write_entries, refresh_entries, reset_manifest
+)
+from src.etl.loader import add_load_options
+from src.etl.decoders import DECODER_NAMES
+from src.dtypes import compact_dtypes
+from src.config import dispose_engine
+from src.etl.metadata import partition_counts, combine_counts
+
+
+def get_parser(description):
+    """Command line options shared by the ETL scripts"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.environ.get('ETL_WORKERS', os.cpu_count() or 1)),
+        help="Number of worker processes used to parse JSON files (1 disables multiprocessing)"
+    )
+    parser.add_argument(
+        '--full-refresh',
+        action='store_true',
+        help="Ignore the manifest, delete every loaded row and reload all files"
+    )
+    parser.add_argument(
+        '--buffer-rows',
+        type=int,
+        default=int(os.environ.get('ETL_BUFFER_ROWS', 50000)),
+        help="Rows held in memory before they are flushed to the database"
+    )
+    parser.add_argument(
+        '--json-decoder',
+        choices=DECODER_NAMES,
+        default=os.environ.get('ETL_JSON_DECODER', 'auto'),
+        help="JSON parser for the Pulse files; auto uses orjson or simdjson when installed, else the json module"
+    )
+    add_load_options(parser)
+    return parser
+
+
+def list_quarter_files(state_root):
+    """List (state, year, quarter, file_path) tasks for every quarter file under a state directory"""
+    files = []
+    for state in os.listdir(state_root):
+        state_path = os.path.join(state_root, state)
+        for year in os.listdir(state_path):
+            year_path = os.path.join(state_path, year)
+            for quarter_file in os.listdir(year_path):
+                if quarter_file.endswith('.json'):
+                    quarter = int(quarter_file.strip('.json'))
+                    files.append((state, int(year), quarter, os.path.join(year_path, quarter_file)))
+
+    # Sort so the output is the same regardless of filesystem or worker order
+    files.sort()
+    return files
+
+
+def read_batch(parse_file, task):
+    """Materialise the records a parser yields for one file"""
+    return list(parse_file(task))
+
+
+def iter_batches(files, parse_file, workers=1, label="files"):
+    """Yield (task, records) for each file, in the order of `files`.
+
+    With workers > 1 files are parsed in a process pool, but only a small
+    window of files is in flight at any time so memory does not grow with the
+    size of the tree.
+    """
+    start = time.perf_counter()
+    reader = partial(read_batch, parse_file)
+
+    if workers > 1 and len(files) > 1:
+        window = workers * 4
+        # Workers never use the parent's pooled connections, and must not close them
+        with ProcessPoolExecutor(max_workers=workers, initializer=dispose_engine, initargs=(False,)) as pool:
+            pending = deque()
+            for task in files:
+                pending.append((task, pool.submit(reader, task)))
+                if len(pending) >= window:
+                    done_task, future = pending.popleft()
+                    yield done_task, future.result()
+            while pending:
+                done_task, future = pending.popleft()
+                yield done_task, future.result()
+    else:
+        workers = 1
+        for task in files:
+            yield task, reader(task)
+
+    elapsed = time.perf_counter() - start
+    rate = len(files) / elapsed if elapsed > 0 else 0.0
+    print(f"Parsed {len(files)} {label} in {elapsed:.2f}s ({rate:.1f} files/sec, {workers} workers)")
+
+
+class ColumnBuffer:
+    """Bounded column buffer that flushes record batches to a table"""
+
+    def __init__(self, columns, flush_frame, max_rows=50000):
+        self.columns = columns
+        self.flush_frame = flush_frame
+        self.max_rows = max_rows
+        self.data = {column: [] for column in columns}
+        self.size = 0
+        self.total_rows = 0
+        self.load_seconds = 0.0
+
+    def extend(self, records):
+        """Add a batch of record tuples, flushing once the buffer is full"""
+        for column, values in zip(self.columns, zip(*records)):
+            self.data[column].extend(values)
+        self.size += len(records)
+        if self.size >= self.max_rows:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows and start over with empty columns"""
+        if not self.size:
+            return
+        start = time.perf_counter()
+        self.flush_frame(compact_dtypes(pd.DataFrame(self.data, columns=self.columns)))
+        self.load_seconds += time.perf_counter() - start
+        self.total_rows += self.size
+        self.data = {column: [] for column in self.columns}
+        self.size = 0
+
+
+def load_dataset(store, table_name, columns, files, parse_file, args, label="files"):
+    """Incrementally stream quarter files into a table.
+
+    Only (year, quarter) partitions with new, changed or removed files are
+    parsed; their existing rows are deleted and replaced in one transaction
+    together with the manifest entries, so a re-run never duplicates rows.
+    Records are written through a bounded ColumnBuffer, so memory stays flat
+    whatever the number of files. `store` is the SqlStore or ParquetStore
+    the rows go to; its engine holds the manifest. The metadata table is
+    updated with the row counts of the reloaded partitions. Returns the
+    reloaded partitions, or None when the table was reset and reloaded whole.
+    """
+    engine = store.engine
+    ensure_manifest(engine)
+    reset = args.full_refresh or not store.exists(table_name)
+
+    if reset:
+        with engine.begin() as conn:
+            store.reset(conn, table_name)
+            reset_manifest(conn, table_name)
+        manifest = {}
+    else:
+        manifest = load_manifest(engine, table_name)
+
+    dirty, refreshed = plan_changes(files, manifest)
+    if not dirty:
+        with engine.begin() as conn:
+            refresh_entries(conn, refreshed)
+        print(f"{table_name}: {len(files)} files unchanged, nothing to load")
+        return None if reset else []
+
+    tasks = [task for partition_tasks in dirty.values() for task in partition_tasks]
+    entries = []
+
+    with engine.begin() as conn:
+        store.delete_partitions(conn, table_name, dirty)
+        clear_partitions(conn, table_name, dirty)
+
+        write = store.writer(conn, table_name, args)
+        counts = []
+
+        def write_and_count(df):
+            counts.append(partition_counts(df, table_name))
+            write(df)
+
+        buffer = ColumnBuffer(columns, write_and_count, args.buffer_rows)
+        for task, records in iter_batches(tasks, parse_file, args.workers, label):
+            buffer.extend(records)
+            entries.append(manifest_entry(table_name, task, len(records)))
+        buffer.flush()
+
+        write_entries(conn, entries)
+        refresh_entries(conn, refreshed)
+        store.write_metadata(conn, table_name, sorted(dirty), combine_counts(counts))
+        store.commit(table_name, sorted(dirty))
+
+    rate = buffer.total_rows / buffer.load_seconds if buffer.load_seconds > 0 else 0.0
+    print(f"{table_name}: reloaded {len(dirty)} partitions, {len(tasks)} files, "
+          f"{buffer.total_rows:,} rows ({rate:,.0f} rows/sec, {store.describe(args)})")
+    return None if reset else sorted(dirty)
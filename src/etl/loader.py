@@ -0,0 +1,83 @@
+import os
+import time
+import tempfile
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from src.sql.sql_queries import ALLOWED_TABLES
+
+LOAD_METHODS = ('multi', 'infile', 'default')
+
+
+def add_load_options(parser):
+    """Add bulk-load options to an ETL argument parser"""
+    parser.add_argument(
+        '--load-method',
+        choices=LOAD_METHODS,
+        default=os.environ.get('ETL_LOAD_METHOD', 'multi'),
+        help="multi: chunked multi-row INSERTs, infile: LOAD DATA LOCAL INFILE from a staged TSV "
+             "(needs DB_LOCAL_INFILE=1 and local_infile enabled on the server), default: plain DataFrame.to_sql"
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=int(os.environ.get('ETL_CHUNKSIZE', 5000)),
+        help="Rows per INSERT statement for the multi/default load methods"
+    )
+    return parser
+
+
+def load_infile(df, table_name, conn):
+    """Stage the frame as a TSV file and load it with LOAD DATA LOCAL INFILE"""
+    fd, path = tempfile.mkstemp(prefix=f"{table_name}_", suffix='.tsv')
+    os.close(fd)
+    try:
+        df.to_csv(path, sep='\t', header=False, index=False, lineterminator='\n', na_rep='NULL')
+        columns = ", ".join(df.columns)
+        conn.execute(
+            text(f"""
+                LOAD DATA LOCAL INFILE :path INTO TABLE {table_name}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                LINES TERMINATED BY '\\n'
+                ({columns})
+            """),
+            {'path': path.replace(os.sep, '/')}
+        )
+    finally:
+        os.remove(path)
+
+
+def bulk_load(df, table_name, conn, method='multi', chunksize=5000, report=True):
+    """Append a DataFrame to one of the Pulse tables, optionally reporting rows/sec"""
+    if table_name not in ALLOWED_TABLES:
+        raise ValueError(f"Invalid table name: {table_name}")
+
+    start = time.perf_counter()
+
+    if method == 'infile':
+        if not inspect(conn).has_table(table_name):
+            print(f"{table_name}: table does not exist yet, using multi-row inserts instead of LOAD DATA")
+            method = 'multi'
+        else:
+            try:
+                load_infile(df, table_name, conn)
+            except DBAPIError as e:
+                print(f"{table_name}: LOAD DATA LOCAL INFILE failed ({e.orig}), using multi-row inserts")
+                method = 'multi'
+
+    if method != 'infile':
+        df.to_sql(
+            table_name,
+            con=conn,
+            if_exists='append',
+            index=False,
+            chunksize=chunksize,
+            method='multi' if method == 'multi' else None
+        )
+
+    if report:
+        elapsed = time.perf_counter() - start
+        rate = len(df) / elapsed if elapsed > 0 else 0.0
+        print(f"{table_name}: loaded {len(df):,} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec, {method})")
+
+    return len(df)
@@ -0,0 +1,149 @@
+import os
+import hashlib
+from datetime import datetime
+from sqlalchemy import text
+
+MANIFEST_TABLE = 'etl_manifest'
+
+MANIFEST_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+        table_name VARCHAR(50) NOT NULL,
+        file_path VARCHAR(255) NOT NULL,
+        year INT NOT NULL,
+        quarter INT NOT NULL,
+        file_size BIGINT NOT NULL,
+        file_mtime DOUBLE NOT NULL,
+        content_hash CHAR(40) NOT NULL,
+        row_count INT NOT NULL,
+        loaded_at DATETIME NOT NULL,
+        PRIMARY KEY (table_name, file_path)
+    )
+"""
+
+
+def ensure_manifest(engine):
+    """Create the manifest table if it does not exist yet"""
+    with engine.begin() as conn:
+        conn.execute(text(MANIFEST_DDL))
+
+
+def manifest_path(file_path):
+    """Path as stored in the manifest, independent of the OS path separator"""
+    return file_path.replace(os.sep, '/')
+
+
+def content_hash(file_path):
+    """SHA-1 of the file contents"""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_manifest(engine, table_name):
+    """Manifest entries for a table, keyed by file path"""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT * FROM {MANIFEST_TABLE} WHERE table_name = :table_name"),
+            {'table_name': table_name}
+        ).mappings().all()
+    return {row['file_path']: dict(row) for row in rows}
+
+
+def plan_changes(files, manifest):
+    """Work out which (year, quarter) partitions have to be reloaded.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read. If only the stat changed but the content hash did not, the file is
+    still skipped and its manifest entry refreshed. A partition is reloaded as
+    a whole when any of its files is new or changed, or when a file that was
+    loaded before has disappeared.
+
+    Returns (dirty, refreshed): a dict of (year, quarter) -> tasks to parse,
+    and a list of manifest entries that only need their stat updated.
+    """
+    by_partition = {}
+    for task in files:
+        by_partition.setdefault((task[1], task[2]), []).append(task)
+
+    dirty = set()
+    refreshed = []
+    seen = set()
+
+    for task in files:
+        state, year, quarter, file_path = task
+        path = manifest_path(file_path)
+        seen.add(path)
+        entry = manifest.get(path)
+        stat = os.stat(file_path)
+
+        if entry is None:
+            dirty.add((year, quarter))
+        elif entry['file_size'] == stat.st_size and entry['file_mtime'] == stat.st_mtime:
+            continue
+        elif entry['content_hash'] == content_hash(file_path):
+            refreshed.append({**entry, 'file_size': stat.st_size, 'file_mtime': stat.st_mtime})
+        else:
+            dirty.add((year, quarter))
+
+    for path, entry in manifest.items():
+        if path not in seen:
+            dirty.add((entry['year'], entry['quarter']))
+
+    return {partition: by_partition.get(partition, []) for partition in sorted(dirty)}, refreshed
+
+
+def manifest_entry(table_name, task, row_count, loaded_at=None):
+    """Build a manifest entry for a freshly loaded file"""
+    state, year, quarter, file_path = task
+    stat = os.stat(file_path)
+    return {
+        'table_name': table_name,
+        'file_path': manifest_path(file_path),
+        'year': year,
+        'quarter': quarter,
+        'file_size': stat.st_size,
+        'file_mtime': stat.st_mtime,
+        'content_hash': content_hash(file_path),
+        'row_count': row_count,
+        'loaded_at': loaded_at or datetime.now()
+    }
+
+
+def clear_partitions(conn, table_name, partitions):
+    """Remove manifest entries for the given (year, quarter) partitions"""
+    for year, quarter in partitions:
+        conn.execute(
+            text(f"DELETE FROM {MANIFEST_TABLE} WHERE table_name = :table_name AND year = :year AND quarter = :quarter"),
+            {'table_name': table_name, 'year': year, 'quarter': quarter}
+        )
+
+
+def write_entries(conn, entries):
+    """Insert manifest entries for freshly loaded files"""
+    if entries:
+        conn.execute(
+            text(f"""
+                INSERT INTO {MANIFEST_TABLE}
+                    (table_name, file_path, year, quarter, file_size, file_mtime, content_hash, row_count, loaded_at)
+                VALUES
+                    (:table_name, :file_path, :year, :quarter, :file_size, :file_mtime, :content_hash, :row_count, :loaded_at)
+            """),
+            entries
+        )
+
+
+def refresh_entries(conn, entries):
+    """Update the stored size and mtime of files whose content did not change"""
+    if entries:
+        conn.execute(
+            text(f"""
+                UPDATE {MANIFEST_TABLE}
+                SET file_size = :file_size, file_mtime = :file_mtime
+                WHERE table_name = :table_name AND file_path = :file_path
+            """),
+            entries
+        )
+
+
+def reset_manifest(conn, table_name):
+    """Forget every file loaded into a table"""
+    conn.execute(text(f"DELETE FROM {MANIFEST_TABLE} WHERE table_name = :table_name"), {'table_name': table_name})
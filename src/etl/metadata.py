@@ -0,0 +1,120 @@
+import pandas as pd
+from sqlalchemy import text
+from src.sql.schema import TABLES
+
+# Small table the ETL keeps next to the data: rows per table, period, state and
+# type. The dashboard reads its filter options and row counts from it instead of
+# scanning the Pulse tables.
+METADATA_TABLE = 'pulse_metadata'
+
+METADATA_COLUMNS = ('table_name', 'year', 'quarter', 'state', 'category', 'row_count')
+
+METADATA_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {METADATA_TABLE} (
+        table_name VARCHAR(50) NOT NULL,
+        year SMALLINT NOT NULL,
+        quarter TINYINT NOT NULL,
+        state VARCHAR(100) NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        row_count BIGINT NOT NULL,
+        PRIMARY KEY (table_name, year, quarter, state, category)
+    )
+"""
+
+# Type column recorded as the category of each table; tables without one store ''
+CATEGORY_COLUMNS = ('trans_type', 'insurance_type', 'device_brand')
+
+# Options offered until the ETL has written the metadata (databases loaded before it existed)
+DEFAULT_YEARS = [2018, 2019, 2020, 2021, 2022]
+DEFAULT_QUARTERS = [1, 2, 3, 4]
+DEFAULT_CATEGORIES = {
+    'aggr_transaction': [
+        "Recharge & bill payments", "Peer-to-peer payments", "Merchant payments", "Financial Services", "Others"
+    ]
+}
+
+
+# ============ COUNTING ============
+
+def category_column(table_name):
+    """Type column of a Pulse table, or None"""
+    columns = TABLES[table_name]['columns'] if table_name in TABLES else ()
+    return next((column for column in CATEGORY_COLUMNS if column in columns), None)
+
+
+def partition_counts(df, table_name):
+    """Rows of a loaded batch per year, quarter, state and category"""
+    column = category_column(table_name)
+    keys = pd.DataFrame({
+        'year': df['year'].astype('int64'),
+        'quarter': df['quarter'].astype('int64'),
+        'state': df['state'].astype(str),
+        'category': df[column].astype(str) if column else ''
+    })
+    counts = keys.groupby(['year', 'quarter', 'state', 'category']).size().rename('row_count').reset_index()
+    counts.insert(0, 'table_name', table_name)
+    return counts
+
+
+def combine_counts(counts):
+    """Add up the counts of several batches; a group can span two flushes"""
+    if not counts:
+        return pd.DataFrame(columns=METADATA_COLUMNS)
+    combined = pd.concat(counts, ignore_index=True)
+    return combined.groupby(list(METADATA_COLUMNS[:-1]), as_index=False)['row_count'].sum()
+
+
+# ============ SQL STORE ============
+
+def clear_metadata(conn, table_name, partitions=None):
+    """Delete the metadata of a table, or of the given (year, quarter) partitions only, creating the table if needed"""
+    conn.execute(text(METADATA_DDL))
+    if partitions is None:
+        conn.execute(text(f"DELETE FROM {METADATA_TABLE} WHERE table_name = :table_name"), {'table_name': table_name})
+        return
+    for year, quarter in partitions:
+        conn.execute(
+            text(f"DELETE FROM {METADATA_TABLE} WHERE table_name = :table_name AND year = :year AND quarter = :quarter"),
+            {'table_name': table_name, 'year': year, 'quarter': quarter}
+        )
+
+
+def write_metadata(conn, counts):
+    """Insert metadata rows built by combine_counts()"""
+    if len(counts):
+        conn.execute(
+            text(f"""
+                INSERT INTO {METADATA_TABLE} ({', '.join(METADATA_COLUMNS)})
+                VALUES ({', '.join(':' + column for column in METADATA_COLUMNS)})
+            """),
+            counts.to_dict('records')
+        )
+
+
+# ============ FILTER OPTIONS ============
+
+def filter_options(catalog):
+    """Years, quarters, states and categories per table found in the metadata rows"""
+    if catalog.empty:
+        return {'years': DEFAULT_YEARS, 'quarters': DEFAULT_QUARTERS, 'states': [], 'categories': DEFAULT_CATEGORIES}
+    categories = catalog[catalog['category'] != ''].groupby('table_name', observed=True)['category'].unique()
+    return {
+        'years': sorted(int(year) for year in catalog['year'].unique()),
+        'quarters': sorted(int(quarter) for quarter in catalog['quarter'].unique()),
+        'states': sorted(str(state) for state in catalog['state'].unique()),
+        'categories': {str(table): sorted(str(value) for value in values) for table, values in categories.items()}
+    }
+
+
+def catalog_rows(catalog, table_name, year=None, quarter=None, state=None):
+    """Row count of a table under the Raw Data filters, or None if the table has no metadata"""
+    rows = catalog[catalog['table_name'] == table_name]
+    if rows.empty:
+        return None
+    if year:
+        rows = rows[rows['year'] == year]
+    if quarter:
+        rows = rows[rows['quarter'] == quarter]
+    if state:
+        rows = rows[rows['state'] == state]
+    return int(rows['row_count'].sum())
@@ -0,0 +1,179 @@
+import os
+import glob
+import uuid
+import shutil
+from sqlalchemy import create_engine, inspect, text
+from src.config import STORAGE_BACKEND, PARQUET_PATH, get_engine, check_connection
+from src.etl.loader import bulk_load
+from src.sql.schema import TABLES, create_table
+from src.etl.metadata import METADATA_TABLE, clear_metadata, write_metadata
+
+# pyarrow writes the Parquet files for STORAGE_BACKEND=duckdb
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+# ============ MYSQL ============
+
+class SqlStore:
+    """Loads the Pulse tables into the SQL database; rows and manifest commit together"""
+
+    rollups = True
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def check(self):
+        """Open a connection to the database. Returns (ok, message)"""
+        return check_connection(self.engine)
+
+    def exists(self, table_name):
+        """Whether the table has been loaded before"""
+        return inspect(self.engine).has_table(table_name)
+
+    def reset(self, conn, table_name):
+        """Empty a table, creating it with the managed layout if it is missing"""
+        if inspect(conn).has_table(table_name):
+            conn.execute(text(f"DELETE FROM {table_name}"))
+        elif table_name in TABLES:
+            create_table(conn, table_name)
+        clear_metadata(conn, table_name)
+
+    def delete_partitions(self, conn, table_name, partitions):
+        """Delete the rows of the (year, quarter) partitions about to be reloaded"""
+        for year, quarter in partitions:
+            conn.execute(
+                text(f"DELETE FROM {table_name} WHERE year = :year AND quarter = :quarter"),
+                {'year': year, 'quarter': quarter}
+            )
+
+    def writer(self, conn, table_name, args):
+        """Function that appends a DataFrame to the table"""
+        return lambda df: bulk_load(df, table_name, conn, args.load_method, args.chunksize, report=False)
+
+    def write_metadata(self, conn, table_name, partitions, counts):
+        """Replace the metadata rows of the reloaded partitions (of every partition when None)"""
+        clear_metadata(conn, table_name, partitions)
+        write_metadata(conn, counts)
+
+    def commit(self, table_name, partitions):
+        """Make the reloaded partitions visible; the database transaction already does"""
+
+    def describe(self, args):
+        """Load method shown in the ETL summary"""
+        return args.load_method
+
+
+# ============ PARQUET ============
+
+def arrow_schema(table_name):
+    """Arrow schema matching the managed column types, so every file of a table agrees"""
+    if table_name not in TABLES:
+        return None
+    types = {
+        'SMALLINT': pa.int16(), 'TINYINT': pa.int8(), 'BIGINT': pa.int64(),
+        'DOUBLE': pa.float64(), 'VARCHAR': pa.string()
+    }
+    return pa.schema([
+        (column, types[column_type.split()[0].split('(')[0]])
+        for column, column_type in TABLES[table_name]['columns'].items()
+    ])
+
+
+class ParquetStore:
+    """Writes each table as Parquet files partitioned by year and quarter.
+
+    Reloaded partitions are written to a staging directory first and only
+    swapped in once every file parsed, right before the manifest commits.
+    The manifest lives in a SQLite file next to the data.
+    """
+
+    rollups = False
+
+    def __init__(self, path=PARQUET_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{os.path.join(path, 'etl_manifest.db')}")
+
+    def check(self):
+        if pq is None:
+            return False, "STORAGE_BACKEND=duckdb needs the pyarrow package"
+        return True, f"Writing Parquet files to {self.path}"
+
+    def table_path(self, table_name, *parts):
+        return os.path.join(self.path, table_name, *parts)
+
+    def staging_path(self, table_name):
+        return os.path.join(self.path, '.staging', table_name)
+
+    def exists(self, table_name):
+        return os.path.isdir(self.table_path(table_name))
+
+    def reset(self, conn, table_name):
+        shutil.rmtree(self.table_path(table_name), ignore_errors=True)
+        os.makedirs(self.table_path(table_name))
+        self.write_metadata(conn, table_name, None, [])
+
+    def delete_partitions(self, conn, table_name, partitions):
+        # Old partitions are replaced at commit; only drop leftovers of an aborted run here
+        shutil.rmtree(self.staging_path(table_name), ignore_errors=True)
+
+    def writer(self, conn, table_name, args):
+        schema = arrow_schema(table_name)
+
+        def write(df):
+            pq.write_to_dataset(
+                pa.Table.from_pandas(df, schema=schema, preserve_index=False),
+                self.staging_path(table_name),
+                partition_cols=['year', 'quarter'],
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+            )
+        return write
+
+    def metadata_path(self, table_name, year, quarter):
+        # One file per table and partition, so a table's metadata is replaced without touching the others
+        return self.table_path(METADATA_TABLE, f"year={year}", f"quarter={quarter}", f"{table_name}.parquet")
+
+    def write_metadata(self, conn, table_name, partitions, counts):
+        """Replace the metadata files of the reloaded partitions (of every partition when None)"""
+        if partitions is None:
+            paths = glob.glob(self.metadata_path(table_name, '*', '*'))
+        else:
+            paths = [self.metadata_path(table_name, year, quarter) for year, quarter in partitions]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+        schema = pa.schema([
+            ('table_name', pa.string()), ('state', pa.string()), ('category', pa.string()), ('row_count', pa.int64())
+        ])
+        for (year, quarter), rows in (counts.groupby(['year', 'quarter']) if len(counts) else []):
+            path = self.metadata_path(table_name, year, quarter)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(rows.drop(columns=['year', 'quarter']), schema=schema, preserve_index=False), path)
+
+    def commit(self, table_name, partitions):
+        """Swap the staged partitions in, dropping partitions that no longer have files"""
+        staging = self.staging_path(table_name)
+        for year, quarter in partitions:
+            partition = (f"year={year}", f"quarter={quarter}")
+            target = self.table_path(table_name, *partition)
+            staged = os.path.join(staging, *partition)
+            shutil.rmtree(target, ignore_errors=True)
+            if os.path.isdir(staged):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(staged, target)
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def describe(self, args):
+        return "parquet"
+
+
+def get_store(engine=None):
+    """ETL target for the configured STORAGE_BACKEND"""
+    if STORAGE_BACKEND == 'duckdb':
+        return ParquetStore()
+    return SqlStore(engine or get_engine())
@@ -0,0 +1,44 @@
+import os
+import re
+
+# Boundary files shared by the map builder (src/etl/build_geojson.py) and the dashboard.
+# Kept free of database imports so the dashboard can load it without a backend.
+SOURCE_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
+OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'geojson')
+
+# Douglas-Peucker tolerance in degrees (about 110 km per degree) and coordinate precision per detail level
+DETAIL_LEVELS = {
+    'high': (0.001, 5),
+    'medium': (0.005, 4),
+    'low': (0.02, 3)
+}
+
+
+# Older boundary files use names that have since changed
+STATE_ALIASES = {
+    'andaman and nicobar islands': 'andaman and nicobar',
+    'andaman and nicobar island': 'andaman and nicobar',
+    'nct of delhi': 'delhi',
+    'orissa': 'odisha',
+    'pondicherry': 'puducherry',
+    'uttaranchal': 'uttarakhand',
+    'dadra and nagar haveli': 'dadra and nagar haveli and daman and diu',
+    'daman and diu': 'dadra and nagar haveli and daman and diu'
+}
+
+
+# ============ JOIN KEYS ============
+
+def normalise_name(name):
+    """Lower case words only: 'Andaman & Nicobar', 'andaman-&-nicobar' -> 'andaman and nicobar'"""
+    name = str(name).lower().replace('&', ' and ')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', name).split())
+
+
+def district_key(state, district):
+    """Key joining map_* rows (slugs, 'x district') to district boundaries (title case names)"""
+    state = normalise_name(state)
+    district = normalise_name(district)
+    if district.endswith(' district'):
+        district = district[:-len(' district')]
+    return f"{STATE_ALIASES.get(state, state)}|{district}"
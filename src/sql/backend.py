@@ -0,0 +1,163 @@
+import os
+import glob
+import threading
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import inspect
+from src.config import STORAGE_BACKEND, PARQUET_PATH, get_engine, check_connection
+from src.sql.schema import TABLES
+from src.sql.cache import data_version
+from src.dtypes import compact_dtypes
+
+# Optional embedded engine for STORAGE_BACKEND=duckdb (pip install duckdb)
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Column types of read_sql results: "numpy" (classic pandas dtypes) or "pyarrow"
+# (Arrow-backed numeric columns, strings as categoricals over Arrow dictionaries)
+QUERY_DTYPE_BACKEND = os.environ.get("QUERY_DTYPE_BACKEND", "numpy").lower()
+
+# Rows converted to Arrow at a time when read_arrow streams a MySQL result
+ARROW_BATCH_ROWS = int(os.environ.get("ARROW_BATCH_ROWS", 50000))
+
+_duckdb_connection = None
+_duckdb_version = None
+_duckdb_lock = threading.Lock()
+_duckdb_local = threading.local()
+
+
+# ============ DUCKDB OVER PARQUET ============
+
+def parquet_files(table_name):
+    """Glob matching every Parquet file of a table under PARQUET_PATH"""
+    return os.path.join(PARQUET_PATH, table_name, 'year=*', 'quarter=*', '*.parquet')
+
+
+def register_views(conn):
+    """(Re)create one view per table found under PARQUET_PATH, with the MySQL column order"""
+    views = set()
+    for table_name in sorted(os.listdir(PARQUET_PATH)) if os.path.isdir(PARQUET_PATH) else []:
+        pattern = parquet_files(table_name)
+        if not glob.glob(pattern):
+            continue
+        columns = ", ".join(TABLES[table_name]['columns']) if table_name in TABLES else "*"
+        conn.execute(
+            f"CREATE OR REPLACE VIEW {table_name} AS "
+            f"SELECT {columns} FROM read_parquet('{pattern}', hive_partitioning = true)"
+        )
+        views.add(table_name)
+    return views
+
+
+def get_duckdb():
+    """Per-thread DuckDB cursor on a shared in-memory database of Parquet views"""
+    global _duckdb_connection, _duckdb_version
+    if duckdb is None:
+        raise ImportError("STORAGE_BACKEND=duckdb needs the duckdb package (pip install duckdb)")
+
+    # Views are re-registered after every ETL load so new tables show up
+    version = data_version()
+    with _duckdb_lock:
+        if _duckdb_connection is None:
+            _duckdb_connection = duckdb.connect()
+        if _duckdb_version != version:
+            register_views(_duckdb_connection)
+            _duckdb_version = version
+
+    # Cursors share the database but can be used from their own thread
+    if getattr(_duckdb_local, 'cursor', None) is None:
+        _duckdb_local.cursor = _duckdb_connection.cursor()
+    return _duckdb_local.cursor
+
+
+# ============ BACKEND-NEUTRAL ACCESS ============
+
+def default_engine():
+    """SQLAlchemy engine for queries, or None when they run on DuckDB"""
+    return None if STORAGE_BACKEND == 'duckdb' else get_engine()
+
+
+def arrow_columns(table):
+    """Decimal sums as float64 and strings dictionary-encoded, like the DataFrames the app expects"""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+    return table
+
+
+def read_arrow(query, params=None, engine=None):
+    """Run a SELECT written with %s placeholders and return a pyarrow Table.
+
+    DuckDB hands its result over as Arrow directly. On MySQL the rows are
+    fetched ARROW_BATCH_ROWS at a time and turned into Arrow record batches,
+    so only one batch of Python rows is alive at once and the object-dtype
+    DataFrame pd.read_sql builds is skipped. The result is requested with
+    stream_results, but SQLAlchemy has no server-side cursor for
+    mysql-connector, so that driver still buffers the raw result set; the
+    saving there is the Python rows, not the transfer.
+    """
+    params = tuple(params or ())
+    if STORAGE_BACKEND == 'duckdb':
+        result = get_duckdb().execute(query.replace('%s', '?'), list(params)).arrow()
+        # duckdb >= 1.4 returns a RecordBatchReader here, older releases a Table
+        return arrow_columns(result.read_all() if isinstance(result, pa.RecordBatchReader) else result)
+
+    engine = engine or get_engine()
+    if engine.dialect.paramstyle == 'qmark':
+        query = query.replace('%s', '?')
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).exec_driver_sql(query, params)
+        columns = list(result.keys())
+        batches = [
+            pa.table({column: pa.array(list(data)) for column, data in zip(columns, zip(*rows))})
+            for rows in result.partitions(ARROW_BATCH_ROWS)
+        ]
+
+    if not batches:
+        return arrow_columns(pa.table({column: pa.array([]) for column in columns}))
+    # A batch of only NULLs, or of smaller decimals, infers a narrower type than the others
+    return arrow_columns(pa.concat_tables(batches, promote_options='permissive'))
+
+
+def arrow_dtype(arrow_type):
+    """pandas dtype for an Arrow column; dictionaries become categoricals"""
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+def read_pandas(query, params=None, engine=None):
+    """Run a SELECT and return a DataFrame with classic numpy/object dtypes"""
+    if STORAGE_BACKEND == 'duckdb':
+        return get_duckdb().execute(query.replace('%s', '?'), list(params or ())).df()
+    return pd.read_sql(query, engine or get_engine(), params=tuple(params) if params else None)
+
+
+def read_sql(query, params=None, engine=None):
+    """Run a SELECT written with %s placeholders on the configured backend"""
+    if QUERY_DTYPE_BACKEND == 'pyarrow':
+        return read_arrow(query, params, engine).to_pandas(types_mapper=arrow_dtype)
+    return compact_dtypes(read_pandas(query, params, engine))
+
+
+def table_names(engine=None):
+    """Tables (or Parquet views) available to queries"""
+    if STORAGE_BACKEND == 'duckdb':
+        rows = get_duckdb().execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()
+        return {row[0] for row in rows}
+    return set(inspect(engine or get_engine()).get_table_names())
+
+
+def check_backend(engine=None):
+    """Check the configured backend can answer queries. Returns (ok, message)"""
+    if STORAGE_BACKEND == 'duckdb':
+        try:
+            views = table_names()
+        except ImportError as e:
+            return False, str(e)
+        if not views:
+            return False, f"No Parquet data under {PARQUET_PATH}; run the ETL with STORAGE_BACKEND=duckdb first"
+        return True, f"DuckDB ready over {len(views)} Parquet tables in {PARQUET_PATH}"
+    return check_connection(engine)
@@ -0,0 +1,50 @@
+import argparse
+import pyarrow as pa
+from dotenv import load_dotenv
+load_dotenv()
+from src.config import STORAGE_BACKEND
+from src.etl.bench_decoders import bench
+from src.etl.datasets import TOP
+from src.sql.backend import default_engine, read_pandas, read_arrow, arrow_dtype
+
+FETCHERS = {
+    'pandas': read_pandas,
+    'arrow': read_arrow,
+    'arrow->pandas': lambda query, params, engine: read_arrow(query, params, engine).to_pandas(types_mapper=arrow_dtype)
+}
+
+
+def result_megabytes(result):
+    """In-memory size of an Arrow table or DataFrame"""
+    if isinstance(result, pa.Table):
+        return result.nbytes / 1e6
+    return result.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pandas and Arrow fetch paths on the top_* tables")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per fetch path, the best one is reported")
+    parser.add_argument('--year', type=int, help="Only fetch one year")
+    args = parser.parse_args()
+
+    engine = default_engine()
+    where, params = (" WHERE year = %s", (args.year,)) if args.year else ("", ())
+
+    print(f"Backend: {STORAGE_BACKEND}\n")
+    print(f"{'table':<16} {'fetch':<14} {'rows':>8} {'seconds':>9} {'rows/s':>11} {'MB':>8} {'speedup':>8}")
+
+    for table_name in TOP:
+        query = f"SELECT * FROM {table_name}{where}"
+        baseline = None
+        for name, fetch in FETCHERS.items():
+            result = fetch(query, params, engine)
+            seconds = bench(lambda _: fetch(query, params, engine), [None], args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{table_name:<16} {name:<14} {len(result):>8,} {seconds:>9.4f} "
+                f"{len(result) / seconds:>11,.0f} {result_megabytes(result):>8.2f} {baseline / seconds:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import os
+import time
+import pickle
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+import pandas as pd
+
+# Backend: memory (per process), disk (shared between processes) or none
+CACHE_BACKEND = os.environ.get('QUERY_CACHE', 'memory')
+CACHE_TTL = float(os.environ.get('QUERY_CACHE_TTL', 24 * 3600))
+CACHE_MAX_MB = float(os.environ.get('QUERY_CACHE_MAX_MB', 256))
+CACHE_DIR = os.environ.get('QUERY_CACHE_DIR', os.path.join('.cache', 'queries'))
+
+# Touched by the ETL after every load; entries older than it are discarded
+DATA_VERSION_FILE = os.environ.get('QUERY_CACHE_VERSION_FILE', os.path.join('.cache', 'data_version'))
+
+
+def data_version():
+    """Modification time of the data version file, 0 if no load has been recorded"""
+    try:
+        return os.stat(DATA_VERSION_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def mark_data_changed():
+    """Record that the tables changed, invalidating every cached result"""
+    os.makedirs(os.path.dirname(DATA_VERSION_FILE) or '.', exist_ok=True)
+    with open(DATA_VERSION_FILE, 'a'):
+        pass
+    now = time.time_ns()
+    os.utime(DATA_VERSION_FILE, ns=(now, now))
+
+
+def result_size(value):
+    """Approximate memory footprint of a cached result in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def copy_result(value):
+    """Hand out copies so callers can modify a result without touching the cache"""
+    return value.copy() if isinstance(value, pd.DataFrame) else value
+
+
+class MemoryCache:
+    """In-process LRU cache bounded by entry age and total result size"""
+
+    def __init__(self, ttl=CACHE_TTL, max_bytes=CACHE_MAX_MB * 1e6):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.version = data_version()
+        self.lock = threading.Lock()
+
+    def _check_version(self):
+        version = data_version()
+        if version != self.version:
+            self.entries.clear()
+            self.size = 0
+            self.version = version
+
+    def get(self, key):
+        """Cached value for `key`, or None when missing or expired"""
+        with self.lock:
+            self._check_version()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            created, size, value = entry
+            if time.time() - created > self.ttl:
+                del self.entries[key]
+                self.size -= size
+                return None
+            self.entries.move_to_end(key)
+            return copy_result(value)
+
+    def set(self, key, value):
+        """Store a value, evicting least recently used entries to stay under the bound"""
+        size = result_size(value)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            self._check_version()
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (time.time(), size, copy_result(value))
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self):
+        """Drop every entry"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class DiskCache:
+    """Pickle files under a directory, shared by every process on the machine.
+
+    Age is taken from the file's mtime and recency from its atime, which is
+    bumped on every hit so the least recently used files are evicted first.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_MB * 1e6):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + '.pkl')
+
+    def get(self, key):
+        """Cached value for `key`, or None when missing, expired or written before the last load"""
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime > self.ttl or stat.st_mtime_ns < data_version():
+            self._remove(path)
+            return None
+        try:
+            with open(path, 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._remove(path)
+            return None
+        if stored_key != key:
+            return None
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        return value
+
+    def set(self, key, value):
+        """Write a value atomically, then trim the directory to the size bound"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._trim()
+
+    def _trim(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                files.append((stat.st_atime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Delete every cached file"""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                self._remove(entry.path)
+
+
+_shared_cache = None
+
+
+def get_cache(backend=None):
+    """Process-wide result cache for the configured backend (None when caching is off)"""
+    global _shared_cache
+    backend = backend or CACHE_BACKEND
+    if backend == 'none':
+        return None
+    if _shared_cache is None:
+        _shared_cache = DiskCache() if backend == 'disk' else MemoryCache()
+    return _shared_cache
+
+
+def cached(method):
+    """Cache a PhonePeAnalytics method on its name and (defaults-filled) arguments"""
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(bound.arguments.items())[1:]
+        value = cache.get(key)
+        if value is None:
+            value = method(self, *args, **kwargs)
+            cache.set(key, value)
+        return value
+
+    return wrapper
@@ -1,103 +1,139 @@
 CREATE DATABASE IF NOT EXISTS phonepe;
 USE phonepe;
 
+-- Managed schema, kept in sync with src/sql/schema.py. Natural primary keys lead with
+-- (year, quarter, state); existing databases are upgraded with python -m src.sql.migrate
+
 -- Aggregate Tables
-CREATE TABLE aggr_transaction (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    trans_type VARCHAR(50),
+CREATE TABLE IF NOT EXISTS aggr_transaction (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    trans_type VARCHAR(50) NOT NULL,
     trans_count BIGINT,
-    trans_amount DECIMAL(20,2)
+    trans_amount DOUBLE,
+    PRIMARY KEY (year, quarter, state, trans_type),
+    KEY idx_aggr_transaction_state_year (state, year)
 );
 
-CREATE TABLE aggr_user (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
+CREATE TABLE IF NOT EXISTS aggr_user (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
     registered_user BIGINT,
     app_opens BIGINT,
-    device_brand VARCHAR(50),
+    PRIMARY KEY (year, quarter, state),
+    KEY idx_aggr_user_state_year (state, year)
+);
+
+CREATE TABLE IF NOT EXISTS aggr_user_device (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    device_brand VARCHAR(50) NOT NULL,
     device_count BIGINT,
-    device_percentage DECIMAL(20,2)
+    device_percentage DOUBLE,
+    PRIMARY KEY (year, quarter, state, device_brand),
+    KEY idx_aggr_user_device_state_year (state, year)
 );
 
-CREATE TABLE aggr_insurance (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    insurance_type VARCHAR(50),
+CREATE TABLE IF NOT EXISTS aggr_insurance (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    insurance_type VARCHAR(50) NOT NULL,
     insurance_count BIGINT,
-    insurance_amount DECIMAL(20,2)
+    insurance_amount DOUBLE,
+    PRIMARY KEY (year, quarter, state, insurance_type),
+    KEY idx_aggr_insurance_state_year (state, year)
 );
 
+
 -- Map Level Tables
-CREATE TABLE map_transaction (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    district VARCHAR(100),
-    trans_type VARCHAR(50),
+CREATE TABLE IF NOT EXISTS map_transaction (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    district VARCHAR(100) NOT NULL,
+    trans_type VARCHAR(50) NOT NULL,
     trans_count BIGINT,
-    trans_amount DECIMAL(20,2)
+    trans_amount DOUBLE,
+    PRIMARY KEY (year, quarter, state, district, trans_type),
+    KEY idx_map_transaction_state_year (state, year)
 );
 
-CREATE TABLE map_user (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    district VARCHAR(100),
+CREATE TABLE IF NOT EXISTS map_user (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    district VARCHAR(100) NOT NULL,
     registered_user BIGINT,
-    app_opens BIGINT
+    app_opens BIGINT,
+    PRIMARY KEY (year, quarter, state, district),
+    KEY idx_map_user_state_year (state, year)
 );
 
-CREATE TABLE map_insurance (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    insurance_type VARCHAR(50),
+CREATE TABLE IF NOT EXISTS map_insurance (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    district VARCHAR(100) NOT NULL,
+    insurance_type VARCHAR(50) NOT NULL,
     insurance_count BIGINT,
-    insurance_amount DECIMAL(20,2)
+    insurance_amount DOUBLE,
+    PRIMARY KEY (year, quarter, state, district, insurance_type),
+    KEY idx_map_insurance_state_year (state, year)
 );
 
 
--- Top Level Tables 
-CREATE TABLE top_transaction (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    district VARCHAR(100),
-    pincode VARCHAR(20),
-    trans_type VARCHAR(50),
+-- Top Level Tables
+CREATE TABLE IF NOT EXISTS top_transaction (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    district VARCHAR(100) NOT NULL,
+    pincode VARCHAR(32) NOT NULL,
+    trans_type VARCHAR(50) NOT NULL,
     trans_count BIGINT,
-    trans_amount DECIMAL(20,2)
+    trans_amount DOUBLE,
+    PRIMARY KEY (year, quarter, state, district, pincode, trans_type),
+    KEY idx_top_transaction_state_year (state, year)
 );
 
-CREATE TABLE top_user (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    year INT NOT NULL,
-    quarter INT NOT NULL,
-    state VARCHAR(100),
-    district VARCHAR(100),
-    pincode VARCHAR(20),
-    registered_user BIGINT
+CREATE TABLE IF NOT EXISTS top_user (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    district VARCHAR(100) NOT NULL,
+    pincode VARCHAR(32) NOT NULL,
+    registered_user BIGINT,
+    PRIMARY KEY (year, quarter, state, district, pincode),
+    KEY idx_top_user_state_year (state, year)
+);
+
+CREATE TABLE IF NOT EXISTS top_insurance (
+    year SMALLINT NOT NULL,
+    quarter TINYINT NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    district VARCHAR(100) NOT NULL,
+    pincode VARCHAR(32) NOT NULL,
+    insurance_type VARCHAR(50) NOT NULL,
+    insurance_count BIGINT,
+    insurance_amount DOUBLE,
+    PRIMARY KEY (year, quarter, state, district, pincode, insurance_type),
+    KEY idx_top_insurance_state_year (state, year)
 );
 
-CREATE TABLE top_insurance (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+-- ETL Manifest (files already loaded, used for incremental re-runs)
+CREATE TABLE IF NOT EXISTS etl_manifest (
+    table_name VARCHAR(50) NOT NULL,
+    file_path VARCHAR(255) NOT NULL,
     year INT NOT NULL,
     quarter INT NOT NULL,
-    state VARCHAR(100),
-    district VARCHAR(100),
-    pincode VARCHAR(20),
-    insurance_type VARCHAR(50),
-    insurance_count BIGINT,
-    insurance_amount DECIMAL(20,2)
-);
\ No newline at end of file
+    file_size BIGINT NOT NULL,
+    file_mtime DOUBLE NOT NULL,
+    content_hash CHAR(40) NOT NULL,
+    row_count INT NOT NULL,
+    loaded_at DATETIME NOT NULL,
+    PRIMARY KEY (table_name, file_path)
+);
@@ -0,0 +1,40 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import DB_POOL_SIZE
+
+# Threads check connections out of the shared engine pool, so more workers than
+# pooled connections would only queue on the pool
+QUERY_WORKERS = int(os.environ.get("QUERY_WORKERS", DB_POOL_SIZE))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide thread pool for running independent queries, created on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+    return _executor
+
+
+def call(function, args=(), kwargs=None):
+    """Call one query given as (function, args[, kwargs])"""
+    return function(*args, **(kwargs or {}))
+
+
+def run_queries(queries):
+    """Run independent queries concurrently and return their results by name.
+
+    `queries` maps a name to (function, args) or (function, args, kwargs), e.g.
+    {'summary': (analytics.get_executive_summary, (2022, 1))}. The call takes
+    as long as the slowest query; the first exception raised is re-raised.
+    """
+    if len(queries) < 2:
+        return {name: call(*query) for name, query in queries.items()}
+
+    futures = {name: get_executor().submit(call, *query) for name, query in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,26 @@
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+from src.dtypes import compact_dtypes
+from src.sql.backend import read_pandas
+from src.sql.sql_queries import ALLOWED_TABLES
+
+
+def main():
+    argparse.ArgumentParser(description="Report the memory the shared dtypes save on every Pulse table").parse_args()
+
+    print(f"{'table':<18} {'rows':>9} {'before MB':>10} {'after MB':>9} {'saved':>7}")
+    total_before = total_after = 0
+    for table_name in sorted(ALLOWED_TABLES):
+        df = read_pandas(f"SELECT * FROM {table_name}")
+        before = df.memory_usage(deep=True).sum()
+        after = compact_dtypes(df).memory_usage(deep=True).sum()
+        total_before += before
+        total_after += after
+        print(f"{table_name:<18} {len(df):>9,} {before / 1e6:>10.2f} {after / 1e6:>9.2f} {1 - after / before:>7.0%}")
+
+    print(f"{'total':<18} {'':>9} {total_before / 1e6:>10.2f} {total_after / 1e6:>9.2f} {1 - total_after / total_before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import sys
+import argparse
+import pandas as pd
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import inspect, text
+from src.config import get_engine, dispose_engine
+from src.sql.schema import TABLES, create_table, is_managed
+from src.sql.cache import mark_data_changed
+from src.etl.manifest import ensure_manifest, reset_manifest
+from src.etl.etl_rollup import refresh_rollups
+
+# Tables of earlier layouts that nothing reads any more
+# (rollup_user_state: aggr_user itself is one row per state and quarter now)
+DROPPED_TABLES = ('rollup_user_state',)
+
+# Queries the dashboard and ETL run against the raw tables, checked with EXPLAIN
+HOT_QUERIES = [
+    *[
+        (f"{name} by year/quarter", f"SELECT * FROM {name} WHERE year = %s AND quarter = %s", (2022, 1))
+        for name in TABLES
+    ],
+    (
+        "top districts of a state",
+        "SELECT state, district, SUM(trans_amount) FROM map_transaction "
+        "WHERE state = %s AND year = %s GROUP BY state, district",
+        ('maharashtra', 2022)
+    ),
+    (
+        "state rollup of a quarter",
+        "SELECT state, SUM(trans_amount) FROM aggr_transaction WHERE year = %s AND quarter = %s GROUP BY state",
+        (2022, 1)
+    ),
+    (
+        "pincode listing",
+        "SELECT state, pincode, SUM(trans_amount) FROM top_transaction "
+        "WHERE pincode != '-- Missing Data --' AND year = %s AND quarter = %s GROUP BY state, pincode",
+        (2022, 1)
+    )
+]
+
+
+def migrate_table(engine, name):
+    """Bring one table to the managed layout, keeping its rows where possible.
+
+    Returns True if an existing table was rebuilt, so its rollups are stale.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(name):
+        with engine.begin() as conn:
+            create_table(conn, name)
+        print(f"{name}: created")
+        return False
+
+    if is_managed(inspector, name):
+        print(f"{name}: already up to date")
+        return False
+
+    columns = list(TABLES[name]['columns'])
+    existing = {column['name'] for column in inspector.get_columns(name)}
+    new_name, old_name = f"{name}_migrate_new", f"{name}_migrate_old"
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {new_name}"))
+        create_table(conn, name, new_name)
+
+        if set(columns) == existing:
+            # Duplicate natural keys and NULL keys are dropped / defaulted by INSERT IGNORE
+            column_list = ", ".join(columns)
+            conn.execute(text(f"INSERT IGNORE INTO {new_name} ({column_list}) SELECT {column_list} FROM {name}"))
+            before = conn.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+            after = conn.execute(text(f"SELECT COUNT(*) FROM {new_name}")).scalar()
+            status = f"rebuilt, {after:,} rows kept, {before - after:,} duplicate rows dropped"
+        else:
+            # The columns changed, so the rows were extracted differently: start empty
+            # and let the next ETL run reload every file of this table
+            reset_manifest(conn, name)
+            status = "columns changed, recreated empty; rerun the ETL to reload it"
+
+        conn.execute(text(f"RENAME TABLE {name} TO {old_name}, {new_name} TO {name}"))
+        conn.execute(text(f"DROP TABLE {old_name}"))
+
+    print(f"{name}: {status}")
+    return True
+
+
+def check_indexes(engine):
+    """EXPLAIN the hot queries and report any that do not use an index"""
+    failures = 0
+    print(f"{'query':<40} {'table':<18} {'type':<8} {'key':<28} {'rows':>8}")
+    for label, query, params in HOT_QUERIES:
+        plan = pd.read_sql(f"EXPLAIN {query}", engine, params=params)
+        for _, step in plan.iterrows():
+            uses_index = pd.notna(step['key']) and step['type'] != 'ALL'
+            failures += not uses_index
+            print(f"{label:<40} {str(step['table']):<18} {str(step['type']):<8} "
+                  f"{str(step['key']):<28} {step['rows']:>8}{'' if uses_index else '  <- full scan'}")
+
+    if failures:
+        print(f"\n{failures} query steps do not use an index (MySQL may still scan very small tables)")
+    else:
+        print("\nAll hot queries use an index.")
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the managed schema to the Pulse tables")
+    parser.add_argument('--check', action='store_true', help="Only EXPLAIN the hot queries and report index use")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if not args.check:
+        ensure_manifest(engine)
+        with engine.begin() as conn:
+            for name in DROPPED_TABLES:
+                conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        for name in TABLES:
+            if migrate_table(engine, name):
+                # Rows were dropped or the table was emptied: rebuild every partition of its rollups
+                refresh_rollups(engine, name)
+        mark_data_changed()
+
+    indexed = check_indexes(engine)
+    dispose_engine()
+    if not indexed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
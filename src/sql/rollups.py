@@ -0,0 +1,180 @@
+from sqlalchemy import inspect, text
+from src.sql.backend import table_names
+from src.sql.cache import data_version
+
+PINCODE_ROWS = "pincode != '-- Missing Data --'"
+
+# Measures the rollups can answer, per source table: name -> expression over a raw row.
+# Each rollup stores <name>_sum and <name>_rows (non-NULL values) so that both SUM and
+# AVG can be re-aggregated exactly from it.
+MEASURES = {
+    'aggr_transaction': {
+        'trans_amount': 'trans_amount',
+        'trans_count': 'trans_count',
+        'avg_value': 'trans_amount/NULLIF(trans_count, 0)'
+    },
+    'aggr_user': {
+        'registered_user': 'registered_user',
+        'app_opens': 'app_opens',
+        'opens_per_user': 'app_opens/NULLIF(registered_user, 0)'
+    },
+    'aggr_user_device': {
+        'device_count': 'device_count',
+        'device_percentage': 'device_percentage'
+    },
+    'aggr_insurance': {
+        'insurance_amount': 'insurance_amount',
+        'insurance_count': 'insurance_count',
+        'policy_value': 'insurance_amount/NULLIF(insurance_count, 0)'
+    },
+    'map_transaction': {'trans_amount': 'trans_amount', 'trans_count': 'trans_count'},
+    'map_user': {'registered_user': 'registered_user', 'app_opens': 'app_opens'},
+    'map_insurance': {'insurance_amount': 'insurance_amount', 'insurance_count': 'insurance_count'},
+    'top_transaction': {'trans_amount': 'trans_amount', 'trans_count': 'trans_count'},
+    'top_user': {'registered_user': 'registered_user'},
+    'top_insurance': {'insurance_amount': 'insurance_amount', 'insurance_count': 'insurance_count'}
+}
+
+# Rollup tables built by the ETL. Every rollup keeps year and quarter so it can be
+# refreshed one partition at a time; `where` restricts the source rows it covers.
+ROLLUPS = {
+    # Aggregated tables
+    'rollup_transaction_quarter': {'source': 'aggr_transaction', 'dimensions': ('year', 'quarter')},
+    'rollup_transaction_type': {'source': 'aggr_transaction', 'dimensions': ('year', 'quarter', 'trans_type')},
+    'rollup_transaction_state': {'source': 'aggr_transaction', 'dimensions': ('year', 'quarter', 'state')},
+    'rollup_user_quarter': {'source': 'aggr_user', 'dimensions': ('year', 'quarter')},
+    'rollup_user_device': {'source': 'aggr_user_device', 'dimensions': ('year', 'quarter', 'device_brand')},
+    'rollup_insurance_quarter': {'source': 'aggr_insurance', 'dimensions': ('year', 'quarter')},
+    'rollup_insurance_state': {'source': 'aggr_insurance', 'dimensions': ('year', 'quarter', 'state')},
+
+    # District level data rolled up to states
+    'rollup_map_transaction_state': {
+        'source': 'map_transaction', 'dimensions': ('year', 'quarter', 'state', 'trans_type')
+    },
+    'rollup_map_user_state': {'source': 'map_user', 'dimensions': ('year', 'quarter', 'state')},
+    'rollup_map_insurance_state': {
+        'source': 'map_insurance', 'dimensions': ('year', 'quarter', 'state', 'insurance_type')
+    },
+
+    # Pincode level data rolled up to states
+    'rollup_top_transaction_state': {
+        'source': 'top_transaction', 'dimensions': ('year', 'quarter', 'state', 'trans_type'), 'where': PINCODE_ROWS
+    },
+    'rollup_top_user_state': {
+        'source': 'top_user', 'dimensions': ('year', 'quarter', 'state'), 'where': PINCODE_ROWS
+    },
+    'rollup_top_insurance_state': {
+        'source': 'top_insurance', 'dimensions': ('year', 'quarter', 'state', 'insurance_type'), 'where': PINCODE_ROWS
+    }
+}
+
+_existing_rollups = {}
+
+
+# ============ QUERY ROUTING ============
+
+def existing_rollups(engine):
+    """Names of the rollup tables present in the database, re-checked after every ETL load"""
+    key = (id(engine), data_version())
+    if key not in _existing_rollups:
+        _existing_rollups.clear()
+        _existing_rollups[key] = table_names(engine) & set(ROLLUPS)
+    return _existing_rollups[key]
+
+
+def choose_rollup(engine, source, dimensions, where=None):
+    """Smallest existing rollup of `source` that covers `dimensions`, or None"""
+    needed = set(dimensions)
+    candidates = [
+        name for name, rollup in ROLLUPS.items()
+        if rollup['source'] == source and rollup.get('where') == where and needed <= set(rollup['dimensions'])
+    ]
+    existing = existing_rollups(engine)
+    for name in sorted(candidates, key=lambda name: len(ROLLUPS[name]['dimensions'])):
+        if name in existing:
+            return name
+    return None
+
+
+def route(engine, source, dimensions=(), where=None):
+    """Pick the relation a query over `source` should read.
+
+    `dimensions` are the columns the query groups or filters on besides year
+    and quarter. Returns (table, filters, measure) where `filters` must be
+    added to the WHERE clause and measure(name, 'sum'|'avg') renders the
+    aggregate of one of the source's MEASURES against the chosen table. Falls
+    back to the raw table when no rollup covers the query or it is not built.
+    """
+    rollup = choose_rollup(engine, source, ('year', 'quarter') + tuple(dimensions), where)
+
+    if rollup:
+        def measure(name, aggregate='sum'):
+            if aggregate == 'avg':
+                return f"SUM({name}_sum) / NULLIF(SUM({name}_rows), 0)"
+            return f"SUM({name}_sum)"
+        return rollup, [], measure
+
+    def measure(name, aggregate='sum'):
+        expression = MEASURES[source][name]
+        return f"AVG({expression})" if aggregate == 'avg' else f"SUM({expression})"
+    return source, [where] if where else [], measure
+
+
+# ============ BUILDING ============
+
+def rollup_columns(name):
+    """Columns of a rollup table, in the order rollup_select produces them"""
+    rollup = ROLLUPS[name]
+    measures = [
+        column for measure in MEASURES[rollup['source']] for column in (f"{measure}_sum", f"{measure}_rows")
+    ]
+    return list(rollup['dimensions']) + measures + ['row_count']
+
+
+def rollup_select(name, partition=False):
+    """SELECT that computes a rollup from its source, optionally for one :year/:quarter partition"""
+    rollup = ROLLUPS[name]
+    dimensions = ", ".join(rollup['dimensions'])
+    measures = ",\n            ".join(
+        f"SUM({expression}) as {measure}_sum, COUNT({expression}) as {measure}_rows"
+        for measure, expression in MEASURES[rollup['source']].items()
+    )
+    filters = [rollup['where']] if rollup.get('where') else []
+    if partition:
+        filters.append("year = :year AND quarter = :quarter")
+    where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+
+    return f"""
+        SELECT {dimensions},
+            {measures},
+            COUNT(*) as row_count
+        FROM {rollup['source']}
+        {where_clause}
+        GROUP BY {dimensions}
+    """
+
+
+def rollups_for(source):
+    """Rollup names built from a source table"""
+    return [name for name, rollup in ROLLUPS.items() if rollup['source'] == source]
+
+
+def build_rollup(conn, name, partitions=None):
+    """Rebuild a rollup table, or only the given (year, quarter) partitions of it"""
+    inspector = inspect(conn)
+    rebuild = partitions is None or not inspector.has_table(name)
+    if not rebuild:
+        # A rollup whose definition changed since it was built is rebuilt in full
+        rebuild = [column['name'] for column in inspector.get_columns(name)] != rollup_columns(name)
+
+    if rebuild:
+        conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        conn.execute(text(f"CREATE TABLE {name} AS {rollup_select(name)}"))
+        conn.execute(text(f"CREATE INDEX idx_{name}_period ON {name} (year, quarter)"))
+        return
+
+    select = rollup_select(name, partition=True)
+    for year, quarter in partitions:
+        params = {'year': year, 'quarter': quarter}
+        conn.execute(text(f"DELETE FROM {name} WHERE year = :year AND quarter = :quarter"), params)
+        conn.execute(text(f"INSERT INTO {name} {select}"), params)
@@ -0,0 +1,130 @@
+from sqlalchemy import text
+
+YEAR = 'SMALLINT NOT NULL'
+QUARTER = 'TINYINT NOT NULL'
+NAME = 'VARCHAR(100) NOT NULL'
+TYPE = 'VARCHAR(50) NOT NULL'
+PINCODE = 'VARCHAR(32) NOT NULL'
+COUNT = 'BIGINT'
+AMOUNT = 'DOUBLE'
+
+# Managed layout of every Pulse table: column types, natural primary key and the
+# secondary indexes the dashboard reads through. The primary keys lead with
+# (year, quarter, state), which serves every year/quarter filter and GROUP BY state;
+# (state, year) serves the per-state lookups.
+TABLES = {
+    # Aggregated
+    'aggr_transaction': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'trans_type': TYPE,
+            'trans_count': COUNT, 'trans_amount': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'trans_type'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'aggr_user': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'registered_user': COUNT, 'app_opens': COUNT
+        },
+        'primary_key': ('year', 'quarter', 'state'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'aggr_user_device': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'device_brand': TYPE,
+            'device_count': COUNT, 'device_percentage': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'device_brand'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'aggr_insurance': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'insurance_type': TYPE,
+            'insurance_count': COUNT, 'insurance_amount': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'insurance_type'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+
+    # Map
+    'map_transaction': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'district': NAME, 'trans_type': TYPE,
+            'trans_count': COUNT, 'trans_amount': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'district', 'trans_type'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'map_user': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'district': NAME,
+            'registered_user': COUNT, 'app_opens': COUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'district'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'map_insurance': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'district': NAME, 'insurance_type': TYPE,
+            'insurance_count': COUNT, 'insurance_amount': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'district', 'insurance_type'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+
+    # Top
+    'top_transaction': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'district': NAME, 'pincode': PINCODE,
+            'trans_type': TYPE, 'trans_count': COUNT, 'trans_amount': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'district', 'pincode', 'trans_type'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'top_user': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'district': NAME, 'pincode': PINCODE,
+            'registered_user': COUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'district', 'pincode'),
+        'indexes': {'state_year': ('state', 'year')}
+    },
+    'top_insurance': {
+        'columns': {
+            'year': YEAR, 'quarter': QUARTER, 'state': NAME, 'district': NAME, 'pincode': PINCODE,
+            'insurance_type': TYPE, 'insurance_count': COUNT, 'insurance_amount': AMOUNT
+        },
+        'primary_key': ('year', 'quarter', 'state', 'district', 'pincode', 'insurance_type'),
+        'indexes': {'state_year': ('state', 'year')}
+    }
+}
+
+
+def create_table_sql(name, table_name=None):
+    """CREATE TABLE statement for a managed table, optionally under another name"""
+    spec = TABLES[name]
+    lines = [f"{column} {column_type}" for column, column_type in spec['columns'].items()]
+    lines.append(f"PRIMARY KEY ({', '.join(spec['primary_key'])})")
+    return f"CREATE TABLE {table_name or name} (\n    " + ",\n    ".join(lines) + "\n)"
+
+
+def create_index_sql(name, table_name=None):
+    """CREATE INDEX statements for the secondary indexes of a managed table"""
+    return [
+        f"CREATE INDEX idx_{name}_{index} ON {table_name or name} ({', '.join(columns)})"
+        for index, columns in TABLES[name]['indexes'].items()
+    ]
+
+
+def create_table(conn, name, table_name=None):
+    """Create a managed table and its indexes"""
+    conn.execute(text(create_table_sql(name, table_name)))
+    for statement in create_index_sql(name, table_name):
+        conn.execute(text(statement))
+
+
+def is_managed(inspector, name):
+    """Whether an existing table already has the managed columns and primary key"""
+    columns = [column['name'] for column in inspector.get_columns(name)]
+    primary_key = inspector.get_pk_constraint(name)['constrained_columns']
+    return columns == list(TABLES[name]['columns']) and tuple(primary_key) == TABLES[name]['primary_key']
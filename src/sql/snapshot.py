@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import shutil
+import inspect
+import argparse
+import threading
+from itertools import islice
+from concurrent.futures import wait, FIRST_COMPLETED
+import pandas as pd
+from src.config import SNAPSHOT_PATH, dispose_engine
+from src.sql.sql_analysis import PhonePeAnalytics, HEATMAP_SOURCES
+from src.sql.backend import read_sql, table_names
+from src.sql.schema import TABLES
+from src.sql.executor import QUERY_WORKERS, get_executor, call
+from src.sql.sql_queries import python_value
+from src.dtypes import compact_dtypes
+from src.etl.metadata import filter_options
+
+# Results depending on the sidebar's year and quarter ("All" is passed as None)
+PERIOD_METHODS = (
+    'get_executive_summary',
+    'get_transaction_type_distribution',
+    'get_user_engagement_metrics',
+    'get_insurance_adoption_by_state'
+)
+
+# Results depending on the year only
+YEAR_METHODS = ('get_quarterly_trends', 'get_device_brand_popularity')
+
+# Results that ignore the filters
+STATIC_METHODS = ('get_user_growth_rate', 'get_year_over_year_growth', 'get_data_catalog')
+
+# Limits the dashboard asks get_top_states_by_transaction_amount for
+TOP_STATE_LIMITS = (5, 10, 50)
+
+MANIFEST = 'manifest.json'
+
+
+# ============ CALL KEYS ============
+
+def call_key(method_name, args=(), kwargs=None):
+    """Key of a PhonePeAnalytics call with its defaults filled in, so f(2022) and f(year=2022) match"""
+    signature = inspect.signature(getattr(PhonePeAnalytics, method_name))
+    bound = signature.bind(None, *args, **(kwargs or {}))
+    bound.apply_defaults()
+    arguments = [[name, python_value(value)] for name, value in list(bound.arguments.items())[1:]]
+    return json.dumps([method_name, arguments])
+
+
+def snapshot_version(path=SNAPSHOT_PATH):
+    """Modification time of the snapshot manifest, 0 if no snapshot has been built"""
+    try:
+        return os.stat(os.path.join(path, MANIFEST)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+# ============ BUILD ============
+
+def missing_tables():
+    """Pulse tables the snapshot reads that have not been loaded yet"""
+    loaded = table_names()
+    return [table_name for table_name in TABLES if table_name not in loaded]
+
+
+def filter_values(analytics):
+    """Filter options the dashboard offers, from the same metadata it reads them from"""
+    options = filter_options(analytics.get_data_catalog())
+    states = options['states']
+    if not states:
+        # No metadata yet: the district chart offers the states found in the data
+        states = [str(state) for state in read_sql("SELECT DISTINCT state FROM map_transaction")['state']]
+    return options['years'], options['quarters'], states, options['categories']
+
+
+def snapshot_calls(years, quarters, states, categories):
+    """Every (method, args, kwargs) the dashboard can ask for with the given filter options"""
+    year_options = [None] + years
+    quarter_options = [None] + quarters
+
+    calls = []
+    for year in year_options:
+        for quarter in quarter_options:
+            calls += [(name, (year, quarter), {}) for name in PERIOD_METHODS]
+            calls += [('get_top_states_by_transaction_amount', (year, quarter), {'limit': limit}) for limit in TOP_STATE_LIMITS]
+        calls += [(name, (year,), {}) for name in YEAR_METHODS]
+        calls += [('get_top_districts_by_transaction', (state, year), {'limit': 10}) for state in states]
+    calls += [(name, (), {}) for name in STATIC_METHODS]
+
+    # The heatmap always has a concrete year and quarter, and offers the types of the aggregated tables
+    for (data_type, level), (_, _, _, category_column, _) in HEATMAP_SOURCES.items():
+        type_table = HEATMAP_SOURCES[(data_type, 'State')][0]
+        for year in years:
+            for quarter in quarters:
+                for category in [None] + (categories.get(type_table, []) if category_column else []):
+                    calls.append(('get_heatmap_data', (data_type, level, year, quarter, category), {}))
+    return calls
+
+
+def build_snapshot(path=SNAPSHOT_PATH):
+    """Run every dashboard query once and write the results next to a manifest of call keys.
+
+    The snapshot is written to a scratch directory and swapped in whole, so a
+    running dashboard never sees half of it. Queries run concurrently, but only
+    a few results per worker are in flight: each is written as soon as it
+    completes and then dropped.
+    """
+    start = time.perf_counter()
+    analytics = PhonePeAnalytics(use_cache=False)
+    calls = snapshot_calls(*filter_values(analytics))
+
+    building = f"{path}.building"
+    shutil.rmtree(building, ignore_errors=True)
+    manifest = {}
+    queued = iter(enumerate(calls))
+    pending = {}
+    while True:
+        for i, (name, args, kwargs) in islice(queued, 2 * QUERY_WORKERS - len(pending)):
+            pending[get_executor().submit(call, getattr(analytics, name), args, kwargs)] = i
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = pending.pop(future)
+            name, args, kwargs = calls[i]
+            file_name = os.path.join(name, f"{i}.parquet")
+            os.makedirs(os.path.join(building, name), exist_ok=True)
+            future.result().to_parquet(os.path.join(building, file_name), index=False)
+            manifest[call_key(name, args, kwargs)] = file_name
+    with open(os.path.join(building, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    old = f"{path}.old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.isdir(path):
+        os.replace(path, old)
+    os.replace(building, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    print(f"Snapshot: {len(calls):,} results, {size / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s -> {path}")
+
+
+# ============ SERVING ============
+
+def check_snapshot(path=SNAPSHOT_PATH):
+    """Check a snapshot has been built. Returns (ok, message)"""
+    if not snapshot_version(path):
+        return False, f"No dashboard snapshot in {path}; build it with python -m src.sql.snapshot"
+    return True, f"Serving the dashboard snapshot in {path}"
+
+
+class SnapshotAnalytics:
+    """PhonePeAnalytics look-alike that serves results from a snapshot instead of the database.
+
+    Methods take the same arguments as their PhonePeAnalytics counterparts.
+    A rebuilt snapshot is picked up on the next call.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.version = None
+        self.files = {}
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def _check_version(self):
+        version = snapshot_version(self.path)
+        if version != self.version:
+            with open(os.path.join(self.path, MANIFEST), encoding='utf-8') as f:
+                self.files = json.load(f)
+            self.results = {}
+            self.version = version
+
+    def query(self, method_name, args=(), kwargs=None):
+        """Result of a PhonePeAnalytics call as stored in the snapshot"""
+        key = call_key(method_name, args, kwargs)
+        with self.lock:
+            self._check_version()
+            if key not in self.files:
+                raise KeyError(f"{method_name}{tuple(args)} is not in the snapshot; rebuild it with python -m src.sql.snapshot")
+            if key not in self.results:
+                # Parquet keeps categoricals, except in empty results
+                self.results[key] = compact_dtypes(pd.read_parquet(os.path.join(self.path, self.files[key])))
+            return self.results[key].copy()
+
+    def __getattr__(self, name):
+        if name.startswith('get_') and hasattr(PhonePeAnalytics, name):
+            return lambda *args, **kwargs: self.query(name, args, kwargs)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute every dashboard query into a Parquet snapshot")
+    parser.add_argument('--path', default=SNAPSHOT_PATH, help="Snapshot directory (default SNAPSHOT_PATH)")
+    args = parser.parse_args()
+    missing = missing_tables()
+    if missing:
+        parser.exit(1, f"Load every table before building the snapshot; missing: {', '.join(missing)}\n")
+    build_snapshot(args.path)
+    dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,38 @@
 import pandas as pd
-from src.config import engine
+from src.sql.cache import cached, get_cache
+from src.sql.rollups import route
+from src.sql.backend import read_sql, default_engine, table_names
+from src.etl.metadata import METADATA_TABLE, METADATA_COLUMNS
+
+# Source of each heatmap: (table, value column, count column, category column, extra filter)
+# keyed on (data type, level). Every level is rolled up to one row per state.
+HEATMAP_SOURCES = {
+    ('Transactions', 'State'): ('aggr_transaction', 'trans_amount', 'trans_count', 'trans_type', None),
+    ('Users', 'State'): ('aggr_user', 'registered_user', 'app_opens', None, None),
+    ('Insurance', 'State'): ('aggr_insurance', 'insurance_amount', 'insurance_count', 'insurance_type', None),
+    ('Transactions', 'District'): ('map_transaction', 'trans_amount', 'trans_count', 'trans_type', None),
+    ('Users', 'District'): ('map_user', 'registered_user', 'app_opens', None, None),
+    ('Insurance', 'District'): ('map_insurance', 'insurance_amount', 'insurance_count', 'insurance_type', None),
+    ('Transactions', 'Pincode'): ('top_transaction', 'trans_amount', 'trans_count', 'trans_type', "pincode != '-- Missing Data --'"),
+    ('Users', 'Pincode'): ('top_user', 'registered_user', None, None, "pincode != '-- Missing Data --'"),
+    ('Insurance', 'Pincode'): ('top_insurance', 'insurance_amount', 'insurance_count', 'insurance_type', "pincode != '-- Missing Data --'")
+}
 
 class PhonePeAnalytics:
     """SQL queries for PhonePe business analytics"""
     
-    def __init__(self):
-        self.engine = engine
+    def __init__(self, engine=None, use_cache=True):
+        self.engine = engine or default_engine()
+        self.cache = get_cache() if use_cache else None
+
+    def clear_cache(self):
+        """Drop every cached query result"""
+        if self.cache is not None:
+            self.cache.clear()
     
     # ============ SUMMARY DASHBOARDS ============
     
+    @cached
     def get_executive_summary(self, year=None, quarter=None):
         """Get executive summary metrics"""
         filters = []
@@ -22,58 +46,98 @@ class PhonePeAnalytics:
             params.append(quarter)
         
         where_clause = " WHERE " + " AND ".join(filters) if filters else ""
-        params_tuple = tuple(params) if params else None
+
+        # Each subquery reads the smallest rollup holding the columns it needs
+        trans_table, _, trans = route(self.engine, 'aggr_transaction', ('state',))
+        user_table, _, user = route(self.engine, 'aggr_user')
+        ins_table, _, ins = route(self.engine, 'aggr_insurance')
         
         # Transactions - Use COALESCE to handle NULL
         trans_query = f"""
             SELECT 
-                COALESCE(SUM(trans_amount), 0) as total_transaction_amount,
-                COALESCE(SUM(trans_count), 0) as total_transactions,
-                COALESCE(AVG(trans_amount/NULLIF(trans_count, 0)), 0) as avg_transaction_value,
+                COALESCE({trans('trans_amount')}, 0) as total_transaction_amount,
+                COALESCE({trans('trans_count')}, 0) as total_transactions,
+                COALESCE({trans('avg_value', 'avg')}, 0) as avg_transaction_value,
                 COUNT(DISTINCT state) as active_states
-            FROM aggr_transaction
+            FROM {trans_table}
             {where_clause}
         """
         
         # Users - Use COALESCE to handle NULL
         user_query = f"""
             SELECT 
-                COALESCE(SUM(registered_user), 0) as total_users,
-                COALESCE(SUM(app_opens), 0) as total_app_opens,
-                COALESCE(AVG(app_opens/NULLIF(registered_user, 0)), 0) as avg_engagement
-            FROM aggr_user
+                COALESCE({user('registered_user')}, 0) as total_users,
+                COALESCE({user('app_opens')}, 0) as total_app_opens,
+                COALESCE({user('opens_per_user', 'avg')}, 0) as avg_engagement
+            FROM {user_table}
             {where_clause}
         """
         
         # Insurance - Use COALESCE to handle NULL
         ins_query = f"""
             SELECT 
-                COALESCE(SUM(insurance_amount), 0) as total_insurance_amount,
-                COALESCE(SUM(insurance_count), 0) as total_policies
-            FROM aggr_insurance
+                COALESCE({ins('insurance_amount')}, 0) as total_insurance_amount,
+                COALESCE({ins('insurance_count')}, 0) as total_policies
+            FROM {ins_table}
             {where_clause}
         """
         
-        trans_df = pd.read_sql(trans_query, self.engine, params=params_tuple)
-        user_df = pd.read_sql(user_query, self.engine, params=params_tuple)
-        ins_df = pd.read_sql(ins_query, self.engine, params=params_tuple)
-        
-        # Combine all metrics
-        summary = {
-            **trans_df.to_dict('records')[0],
-            **user_df.to_dict('records')[0],
-            **ins_df.to_dict('records')[0]
-        }
-        
-        return pd.DataFrame([summary])
+        # Each subquery returns exactly one row, so joining them gives the
+        # whole summary in a single round-trip
+        query = f"""
+            SELECT t.*, u.*, i.*
+            FROM ({trans_query}) t
+            CROSS JOIN ({user_query}) u
+            CROSS JOIN ({ins_query}) i
+        """
+        return read_sql(query, params * 3, self.engine)
+
+    @cached
+    def get_heatmap_data(self, data_type, level, year=None, quarter=None, category=None):
+        """Get state-wise (district-wise at District level) value and count for the India heatmap"""
+        if (data_type, level) not in HEATMAP_SOURCES:
+            raise ValueError(f"Invalid heatmap selection: {data_type} at {level} level")
+
+        source, value_column, count_column, category_column, extra_filter = HEATMAP_SOURCES[(data_type, level)]
+        grain = ('state', 'district') if level == 'District' else ('state',)
+        dimensions = (grain + (category_column,)) if category and category_column else grain
+        table, filters, measure = route(self.engine, source, dimensions, extra_filter)
+        params = []
+
+        if year:
+            filters.append("year = %s")
+            params.append(year)
+        if quarter:
+            filters.append("quarter = %s")
+            params.append(quarter)
+        if category and category_column:
+            filters.append(f"{category_column} = %s")
+            params.append(category)
+
+        where_clause = " WHERE " + " AND ".join(filters) if filters else ""
+        count_expression = f"COALESCE({measure(count_column)}, 0)" if count_column else "0"
+
+        query = f"""
+            SELECT 
+                {', '.join(grain)},
+                COALESCE({measure(value_column)}, 0) as value,
+                {count_expression} as count
+            FROM {table}
+            {where_clause}
+            GROUP BY {', '.join(grain)}
+        """
+
+        return read_sql(query, params, self.engine)
 
     # ============ TRANSACTION ANALYTICS ============
     
+    @cached
     def get_top_states_by_transaction_amount(self, year=None, quarter=None, limit=10):
         """Get top states by transaction amount"""
-        query = """
-            SELECT state, SUM(trans_amount) as trans_amount, SUM(trans_count) as trans_count
-            FROM aggr_transaction
+        table, _, measure = route(self.engine, 'aggr_transaction', ('state',))
+        query = f"""
+            SELECT state, {measure('trans_amount')} as trans_amount, {measure('trans_count')} as trans_count
+            FROM {table}
         """
         filters = []
         params = []
@@ -90,16 +154,18 @@ class PhonePeAnalytics:
         
         query += f" GROUP BY state ORDER BY trans_amount DESC LIMIT {limit}"
         
-        return pd.read_sql(query, self.engine, params=tuple(params) if params else None)
+        return read_sql(query, params, self.engine)
     
+    @cached
     def get_transaction_type_distribution(self, year=None, quarter=None):
         """Get distribution of transaction types"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_transaction', ('trans_type',))
+        query = f"""
             SELECT trans_type, 
-                   SUM(trans_amount) as trans_amount, 
-                   SUM(trans_count) as trans_count,
-                   AVG(trans_amount/trans_count) as avg_transaction_value
-            FROM aggr_transaction
+                   {measure('trans_amount')} as trans_amount, 
+                   {measure('trans_count')} as trans_count,
+                   {measure('avg_value', 'avg')} as avg_transaction_value
+            FROM {table}
         """
         filters = []
         params = []
@@ -116,24 +182,27 @@ class PhonePeAnalytics:
         
         query += " GROUP BY trans_type ORDER BY trans_amount DESC"
         
-        return pd.read_sql(query, self.engine, params=tuple(params) if params else None)
+        return read_sql(query, params, self.engine)
     
+    @cached
     def get_quarterly_trends(self, year):
         """Get quarterly transaction trends for a specific year"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_transaction', ('state',))
+        query = f"""
             SELECT 
                 quarter,
-                SUM(trans_amount) as trans_amount,
-                SUM(trans_count) as trans_count,
+                {measure('trans_amount')} as trans_amount,
+                {measure('trans_count')} as trans_count,
                 COUNT(DISTINCT state) as active_states
-            FROM aggr_transaction
+            FROM {table}
             WHERE year = %s
             GROUP BY quarter
             ORDER BY quarter
         """
         
-        return pd.read_sql(query, self.engine, params=(year,))
+        return read_sql(query, (year,), self.engine)
 
+    @cached
     def get_top_districts_by_transaction(self, state=None, year=None, limit=10):
         """Get top districts by transaction amount"""
         query = """
@@ -159,19 +228,21 @@ class PhonePeAnalytics:
         
         query += f" GROUP BY state, district ORDER BY trans_amount DESC LIMIT {limit}"
         
-        return pd.read_sql(query, self.engine, params=tuple(params) if params else None)
+        return read_sql(query, params, self.engine)
 
     # ============ USER ANALYTICS ============
     
+    @cached
     def get_user_engagement_metrics(self, year=None, quarter=None):
         """Get user engagement metrics"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_user', ('state',))
+        query = f"""
             SELECT 
                 state,
-                SUM(registered_user) as total_users,
-                SUM(app_opens) as total_app_opens,
-                AVG(app_opens/registered_user) as avg_opens_per_user
-            FROM aggr_user
+                {measure('registered_user')} as total_users,
+                {measure('app_opens')} as total_app_opens,
+                {measure('opens_per_user', 'avg')} as avg_opens_per_user
+            FROM {table}
         """
         filters = []
         params = []
@@ -188,16 +259,18 @@ class PhonePeAnalytics:
         
         query += " GROUP BY state ORDER BY total_users DESC"
         
-        return pd.read_sql(query, self.engine, params=tuple(params) if params else None)
+        return read_sql(query, params, self.engine)
 
+    @cached
     def get_device_brand_popularity(self, year=None):
         """Get most popular device brands"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_user_device', ('device_brand',))
+        query = f"""
             SELECT 
                 device_brand,
-                SUM(device_count) as total_devices,
-                AVG(device_percentage) as avg_percentage
-            FROM aggr_user
+                {measure('device_count')} as total_devices,
+                {measure('device_percentage', 'avg')} as avg_percentage
+            FROM {table}
         """
         filters = ["device_brand != ''"]
         params = []
@@ -209,34 +282,38 @@ class PhonePeAnalytics:
         query += " WHERE " + " AND ".join(filters)
         query += " GROUP BY device_brand ORDER BY total_devices DESC LIMIT 15"
         
-        return pd.read_sql(query, self.engine, params=tuple(params) if params else None)
+        return read_sql(query, params, self.engine)
     
+    @cached
     def get_user_growth_rate(self):
         """Calculate user growth rate over years"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_user')
+        query = f"""
             SELECT 
                 year,
                 quarter,
-                SUM(registered_user) as total_users,
-                SUM(app_opens) as total_app_opens
-            FROM aggr_user
+                {measure('registered_user')} as total_users,
+                {measure('app_opens')} as total_app_opens
+            FROM {table}
             GROUP BY year, quarter
             ORDER BY year, quarter
         """
         
-        return pd.read_sql(query, self.engine)
+        return read_sql(query, engine=self.engine)
 
     # ============ INSURANCE ANALYTICS ============
     
+    @cached
     def get_insurance_adoption_by_state(self, year=None, quarter=None):
         """Get insurance adoption metrics by state"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_insurance', ('state',))
+        query = f"""
             SELECT 
                 state,
-                SUM(insurance_amount) as insur_amount,
-                SUM(insurance_count) as total_policies,
-                AVG(insurance_amount/insurance_count) as avg_policy_value
-            FROM aggr_insurance
+                {measure('insurance_amount')} as insur_amount,
+                {measure('insurance_count')} as total_policies,
+                {measure('policy_value', 'avg')} as avg_policy_value
+            FROM {table}
         """
         filters = []
         params = []
@@ -253,10 +330,11 @@ class PhonePeAnalytics:
         
         query += " GROUP BY state ORDER BY insur_amount DESC"
         
-        return pd.read_sql(query, self.engine, params=tuple(params) if params else None)
+        return read_sql(query, params, self.engine)
 
         # ============ FETCH RAW DATA ============
 
+    @cached
     def get_top_transaction_districts_wise_data(self, year=None, quarter=None):
         """Get district-wise transaction data from top_transaction table"""
         filters = ["district != '-- Missing Data --'"]
@@ -287,8 +365,9 @@ class PhonePeAnalytics:
             ORDER BY year DESC, quarter DESC, total_trans_amount DESC
         """
         
-        return pd.read_sql(query, self.engine, params=params_tuple)
+        return read_sql(query, params_tuple, self.engine)
 
+    @cached
     def get_top_transaction_pincode_wise_data(self, year=None, quarter=None):
         """Get pincode-wise transaction data from top_transaction table"""
         filters = ["pincode != '-- Missing Data --'"]
@@ -319,8 +398,9 @@ class PhonePeAnalytics:
             ORDER BY year DESC, quarter DESC, total_trans_amount DESC
         """
         
-        return pd.read_sql(query, self.engine, params=params_tuple)
+        return read_sql(query, params_tuple, self.engine)
 
+    @cached
     def get_top_user_districts_wise_data(self, year=None, quarter=None):
         """Get district-wise user data from top_user table"""
         filters = ["district != '-- Missing Data --'"]
@@ -349,8 +429,9 @@ class PhonePeAnalytics:
             ORDER BY year DESC, quarter DESC, total_registered_users DESC
         """
         
-        return pd.read_sql(query, self.engine, params=params_tuple)
+        return read_sql(query, params_tuple, self.engine)
 
+    @cached
     def get_top_user_pincode_wise_data(self, year=None, quarter=None):
         """Get pincode-wise user data from top_user table"""
         filters = ["pincode != '-- Missing Data --'"]
@@ -379,8 +460,9 @@ class PhonePeAnalytics:
             ORDER BY year DESC, quarter DESC, total_registered_users DESC
         """
         
-        return pd.read_sql(query, self.engine, params=params_tuple)
+        return read_sql(query, params_tuple, self.engine)
 
+    @cached
     def get_top_insurance_districts_wise_data(self, year=None, quarter=None):
         """Get district-wise insurance data from top_insurance table"""
         filters = ["district != '-- Missing Data --'"]
@@ -411,8 +493,9 @@ class PhonePeAnalytics:
             ORDER BY year DESC, quarter DESC, total_insurance_amount DESC
         """
         
-        return pd.read_sql(query, self.engine, params=params_tuple)
+        return read_sql(query, params_tuple, self.engine)
 
+    @cached
     def get_top_insurance_pincode_wise_data(self, year=None, quarter=None):
         """Get pincode-wise insurance data from top_insurance table"""
         filters = ["pincode != '-- Missing Data --'"]
@@ -443,25 +526,27 @@ class PhonePeAnalytics:
             ORDER BY year DESC, quarter DESC, total_insurance_amount DESC
         """
         
-        return pd.read_sql(query, self.engine, params=params_tuple)   
+        return read_sql(query, params_tuple, self.engine)
      
     # ============ INSIGHTS ANALYTICS ============
 
+    @cached
     def get_year_over_year_growth(self):
         """Calculate year-over-year transaction growth"""
-        query = """
+        table, _, measure = route(self.engine, 'aggr_transaction')
+        query = f"""
             SELECT 
                 year,
-                SUM(trans_amount) as trans_amount,
-                SUM(trans_count) as trans_count,
-                LAG(SUM(trans_amount)) OVER (ORDER BY year) as prev_year_amount,
-                LAG(SUM(trans_count)) OVER (ORDER BY year) as prev_year_count
-            FROM aggr_transaction
+                {measure('trans_amount')} as trans_amount,
+                {measure('trans_count')} as trans_count,
+                LAG({measure('trans_amount')}) OVER (ORDER BY year) as prev_year_amount,
+                LAG({measure('trans_count')}) OVER (ORDER BY year) as prev_year_count
+            FROM {table}
             GROUP BY year
             ORDER BY year
         """
         
-        df = pd.read_sql(query, self.engine)
+        df = read_sql(query, engine=self.engine)
         
         # Calculate growth percentage
         df['amount_growth'] = ((df['trans_amount'] - df['prev_year_amount']) / df['prev_year_amount'] * 100).round(2)
@@ -469,3 +554,12 @@ class PhonePeAnalytics:
         
         return df
 
+    # ============ DATA CATALOG ============
+
+    @cached
+    def get_data_catalog(self):
+        """Row counts per table, year, quarter, state and type from the ETL-maintained metadata table"""
+        if METADATA_TABLE not in table_names(self.engine):
+            return pd.DataFrame(columns=METADATA_COLUMNS)
+        query = f"SELECT {', '.join(METADATA_COLUMNS)} FROM {METADATA_TABLE}"
+        return read_sql(query, engine=self.engine)
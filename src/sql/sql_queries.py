@@ -1,8 +1,9 @@
 import pandas as pd
-from src.config import engine
+from src.sql.backend import read_sql
+from src.sql.schema import TABLES
 
 ALLOWED_TABLES = {
-    'aggr_transaction', 'aggr_user', 'aggr_insurance',
+    'aggr_transaction', 'aggr_user', 'aggr_user_device', 'aggr_insurance',
     'map_transaction', 'map_user', 'map_insurance', 
     'top_transaction', 'top_user', 'top_insurance'
 }
@@ -22,7 +23,154 @@ def fetch_table_data(table_name, year=None, quarter=None):
         params.append(quarter)
     if filters:
         query += " WHERE " + " AND ".join(filters)
-    return pd.read_sql(query, engine, params=tuple(params))
+    return read_sql(query, params)
+
+
+# ============ PAGINATED EXPLORER ============
+
+# Top-level tables summed per district or pincode (the region), paged like the tables
+# themselves. The group columns act as the primary key of the summed rows.
+GROUPED_TABLES = {
+    'top_transaction_district': {
+        'table': 'top_transaction',
+        'region': 'district',
+        'groups': ('year', 'quarter', 'state', 'district', 'trans_type'),
+        'sums': {'total_trans_count': 'trans_count', 'total_trans_amount': 'trans_amount'}
+    },
+    'top_transaction_pincode': {
+        'table': 'top_transaction',
+        'region': 'pincode',
+        'groups': ('year', 'quarter', 'state', 'pincode', 'trans_type'),
+        'sums': {'total_trans_count': 'trans_count', 'total_trans_amount': 'trans_amount'}
+    },
+    'top_user_district': {
+        'table': 'top_user',
+        'region': 'district',
+        'groups': ('year', 'quarter', 'state', 'district'),
+        'sums': {'total_registered_users': 'registered_user'}
+    },
+    'top_user_pincode': {
+        'table': 'top_user',
+        'region': 'pincode',
+        'groups': ('year', 'quarter', 'state', 'pincode'),
+        'sums': {'total_registered_users': 'registered_user'}
+    },
+    'top_insurance_district': {
+        'table': 'top_insurance',
+        'region': 'district',
+        'groups': ('year', 'quarter', 'state', 'district', 'insurance_type'),
+        'sums': {'total_insurance_count': 'insurance_count', 'total_insurance_amount': 'insurance_amount'}
+    },
+    'top_insurance_pincode': {
+        'table': 'top_insurance',
+        'region': 'pincode',
+        'groups': ('year', 'quarter', 'state', 'pincode', 'insurance_type'),
+        'sums': {'total_insurance_count': 'insurance_count', 'total_insurance_amount': 'insurance_amount'}
+    }
+}
+
+
+def table_filters(year=None, quarter=None, state=None):
+    filters = []
+    params = []
+    for column, value in (("year", year), ("quarter", quarter), ("state", state)):
+        if value is not None:
+            filters.append(f"{column} = %s")
+            params.append(value)
+    return filters, params
+
+
+def table_columns(table_name):
+    """Column types and primary key of a table or grouped table the explorer pages through"""
+    if table_name in TABLES:
+        return TABLES[table_name]['columns'], TABLES[table_name]['primary_key']
+    if table_name not in GROUPED_TABLES:
+        raise ValueError(f"Invalid table name: {table_name}")
+    grouped = GROUPED_TABLES[table_name]
+    columns = {column: TABLES[grouped['table']]['columns'][column] for column in grouped['groups']}
+    # Sums are COALESCEd to 0, so they are never NULL
+    columns.update({name: 'DOUBLE NOT NULL' for name in grouped['sums']})
+    return columns, grouped['groups']
+
+
+def page_source(table_name, year=None, quarter=None, state=None):
+    """FROM clause of a page with the filters left to apply to it.
+
+    A grouped table is summed in a subquery that takes the filters itself, so the
+    keyset condition and ORDER BY run over the summed rows.
+    """
+    filters, params = table_filters(year, quarter, state)
+    if table_name in TABLES:
+        return table_name, filters, params
+    if table_name not in GROUPED_TABLES:
+        raise ValueError(f"Invalid table name: {table_name}")
+
+    grouped = GROUPED_TABLES[table_name]
+    groups = ", ".join(grouped['groups'])
+    sums = ", ".join(f"COALESCE(SUM({column}), 0) AS {name}" for name, column in grouped['sums'].items())
+    filters.append(f"{grouped['region']} != '-- Missing Data --'")
+    source = f"(SELECT {groups}, {sums} FROM {grouped['table']} WHERE {' AND '.join(filters)} GROUP BY {groups}) summed"
+    return source, [], params
+
+
+def count_table_rows(table_name, year=None, quarter=None, state=None):
+    source, filters, params = page_source(table_name, year, quarter, state)
+    query = f"SELECT COUNT(*) AS row_count FROM {source}"
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+    return int(read_sql(query, params)['row_count'].iloc[0])
+
+
+def python_value(value):
+    # numpy scalars cannot be passed back to the database driver as parameters
+    return value.item() if hasattr(value, 'item') else value
+
+
+def page_order(table_name, sort_by=None):
+    # The sort column followed by the primary key, so the order is total and a
+    # page can start right after the key of the previous page's last row
+    columns, primary_key = table_columns(table_name)
+    if sort_by is None:
+        return primary_key
+    if sort_by not in columns:
+        raise ValueError(f"Invalid sort column: {sort_by}")
+    return (sort_by,) + tuple(column for column in primary_key if column != sort_by)
+
+
+def fetch_table_page(table_name, year=None, quarter=None, state=None,
+                     sort_by=None, descending=False, after=None, page_size=100):
+    """One page of a table in keyset order.
+
+    `after` is the key returned with the previous page (None for the first
+    page), so a page costs an index range scan rather than an OFFSET over
+    every row before it. Returns (rows, key to pass as `after` for the next page).
+    """
+    order = page_order(table_name, sort_by)
+    columns, _ = table_columns(table_name)
+    # Measures may be NULL, which would never compare greater or smaller
+    keys = [column if 'NOT NULL' in columns[column] else f"COALESCE({column}, 0)" for column in order]
+
+    source, filters, params = page_source(table_name, year, quarter, state)
+    if after is not None:
+        # (k1, k2, ...) > (v1, v2, ...) spelled out, which every backend can plan
+        operator = "<" if descending else ">"
+        branches = []
+        for i, key in enumerate(keys):
+            branches.append(" AND ".join([f"{k} = %s" for k in keys[:i]] + [f"{key} {operator} %s"]))
+            params.extend(after[:i + 1])
+        filters.append("(" + " OR ".join(f"({branch})" for branch in branches) + ")")
+
+    direction = " DESC" if descending else ""
+    query = f"SELECT * FROM {source}"
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+    query += " ORDER BY " + ", ".join(f"{key}{direction}" for key in keys) + f" LIMIT {int(page_size)}"
+
+    rows = read_sql(query, params)
+    if rows.empty:
+        return rows, None
+    last = rows.iloc[-1]
+    return rows, tuple(0 if pd.isna(last[column]) else python_value(last[column]) for column in order)
 
 
 # Aggregate tables
@@ -32,6 +180,9 @@ def get_aggr_transaction(year=None, quarter=None):
 def get_aggr_user(year=None, quarter=None):
     return fetch_table_data("aggr_user", year, quarter)
 
+def get_aggr_user_device(year=None, quarter=None):
+    return fetch_table_data("aggr_user_device", year, quarter)
+
 def get_aggr_insurance(year=None, quarter=None):
     return fetch_table_data("aggr_insurance", year, quarter)
 
@@ -1,5 +1,19 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache, wraps
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from src.geo import SOURCE_URL, OUTPUT_DIR, DETAIL_LEVELS, district_key
+
+# Boundary detail used by every choropleth: high, medium or low (see src/etl/build_geojson.py)
+MAP_DETAIL = os.environ.get("MAP_DETAIL", "medium")
+
+# Figures kept by cached_figure (0 turns the cache off)
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", 64))
 
 # State name mapping (same as before)
 STATE_MAPPING = {
@@ -44,18 +58,83 @@ STATE_MAPPING = {
 def map_state_names(df):
     """Map state names to proper format"""
     if 'state' in df.columns:
-        df['state'] = df['state'].map(STATE_MAPPING).fillna(df['state'])
+        df['state'] = df['state'].map(lambda state: STATE_MAPPING.get(state, state))
     return df
 
+# ============ FIGURE CACHE ============
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+
+def fingerprint(value):
+    """Hashable stand-in for a chart argument; DataFrames are hashed by content and row order"""
+    if isinstance(value, pd.DataFrame):
+        return (
+            tuple(value.columns),
+            tuple(str(dtype) for dtype in value.dtypes),
+            hashlib.sha1(pd.util.hash_pandas_object(value, index=True).values.tobytes()).hexdigest()
+        )
+    return value
+
+def cached_figure(plot):
+    """Reuse the figure built for the same data and parameters on an earlier rerun.
+
+    Figures are kept in a least recently used cache of FIGURE_CACHE_SIZE
+    entries. The same object is handed out on every hit, so callers must not
+    modify it.
+    """
+    @wraps(plot)
+    def wrapper(*args, **kwargs):
+        if FIGURE_CACHE_SIZE <= 0:
+            return plot(*args, **kwargs)
+        key = (plot.__name__,) + tuple(fingerprint(arg) for arg in args) + \
+            tuple((name, fingerprint(value)) for name, value in sorted(kwargs.items()))
+        with _figures_lock:
+            fig = _figures.get(key)
+            if fig is not None:
+                _figures.move_to_end(key)
+                return fig
+        fig = plot(*args, **kwargs)
+        with _figures_lock:
+            _figures[key] = fig
+            while len(_figures) > FIGURE_CACHE_SIZE:
+                _figures.popitem(last=False)
+        return fig
+
+    return wrapper
+
 # ============ INDIA MAPS ============
 
+@lru_cache(maxsize=None)
+def india_states_geojson(detail=MAP_DETAIL):
+    """State boundaries parsed once per process from the local asset, or the remote URL if it was not built"""
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"Invalid map detail: {detail}")
+    path = os.path.join(OUTPUT_DIR, f"india_states_{detail}.geojson")
+    if not os.path.exists(path):
+        return SOURCE_URL
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+@lru_cache(maxsize=None)
+def india_districts_geojson(detail=MAP_DETAIL):
+    """District boundaries parsed once per process, or None if they have not been built"""
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"Invalid map detail: {detail}")
+    path = os.path.join(OUTPUT_DIR, f"india_districts_{detail}.geojson")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+@cached_figure
 def plot_india_choropleth(df, value_col, title, color_scale='Viridis'):
     """Create India map with state-wise data"""
     df = map_state_names(df.copy())
     
     fig = px.choropleth(
         df,
-        geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson",
+        geojson=india_states_geojson(),
         featureidkey='properties.ST_NM',
         locations='state',
         color=value_col,
@@ -75,13 +154,14 @@ def plot_india_choropleth(df, value_col, title, color_scale='Viridis'):
     
     return fig
 
+@cached_figure
 def plot_india_heatmap(heatmap_data, metric_name, metric_unit, year, quarter, data_level):
     """Plot heatmap of India with given metric"""
     heatmap_data = map_state_names(heatmap_data.copy())
     
     fig = px.choropleth(
         heatmap_data,
-        geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson",
+        geojson=india_states_geojson(),
         featureidkey='properties.ST_NM',
         locations='state',
         color='value',
@@ -91,6 +171,38 @@ def plot_india_heatmap(heatmap_data, metric_name, metric_unit, year, quarter, da
         labels={'value': metric_name}
     )
     
+    return style_heatmap(fig, metric_name, year, quarter, data_level)
+
+@cached_figure
+def plot_india_district_heatmap(heatmap_data, metric_name, metric_unit, year, quarter):
+    """Plot heatmap of India at district resolution, or state totals if district boundaries are missing"""
+    geojson = india_districts_geojson()
+    if geojson is None:
+        states = heatmap_data.groupby('state', as_index=False, observed=True)[['value', 'count']].sum()
+        return plot_india_heatmap(states, metric_name, metric_unit, year, quarter, "District (state totals)")
+
+    heatmap_data = heatmap_data.copy()
+    heatmap_data['key'] = [
+        district_key(state, district) for state, district in zip(heatmap_data['state'], heatmap_data['district'])
+    ]
+    
+    fig = px.choropleth(
+        heatmap_data,
+        geojson=geojson,
+        featureidkey='properties.key',
+        locations='key',
+        color='value',
+        hover_name='district',
+        hover_data={'state': True, 'value': ':.2f', 'key': False},
+        color_continuous_scale='Purples',
+        labels={'value': metric_name}
+    )
+    fig.update_traces(marker_line_width=0.3)
+    
+    return style_heatmap(fig, metric_name, year, quarter, "District")
+
+def style_heatmap(fig, metric_name, year, quarter, data_level):
+    """Shared map framing and dark layout of the heatmaps"""
     fig.update_geos(
         fitbounds="locations",
         visible=False,
@@ -127,10 +239,11 @@ def plot_india_heatmap(heatmap_data, metric_name, metric_unit, year, quarter, da
 
 # ============ TRANSACTION VISUALIZATIONS ============
 
+@cached_figure
 def plot_top_states_bar(df, top_n=10):
     """Plot top N states by transaction amount"""
     df = map_state_names(df.copy())
-    grouped = df.groupby('state', as_index=False)['trans_amount'].sum()
+    grouped = df.groupby('state', as_index=False, observed=True)['trans_amount'].sum()
     grouped = grouped.nlargest(top_n, 'trans_amount')
     grouped['trans_amount'] = grouped['trans_amount'] / 10000000
     
@@ -157,9 +270,10 @@ def plot_top_states_bar(df, top_n=10):
     
     return fig
 
+@cached_figure
 def plot_transaction_type_distribution(df):
     """Plot transaction type distribution as pie chart"""
-    grouped = df.groupby('trans_type', as_index=False)['trans_amount'].sum()
+    grouped = df.groupby('trans_type', as_index=False, observed=True)['trans_amount'].sum()
     
     fig = px.pie(
         grouped,
@@ -177,12 +291,13 @@ def plot_transaction_type_distribution(df):
     
     return fig
 
+@cached_figure
 def plot_quarterly_comparison(df):
     """Compare quarters within a year"""
     if 'quarter' not in df.columns:
         return None
     
-    grouped = df.groupby('quarter', as_index=False).agg({
+    grouped = df.groupby('quarter', as_index=False, observed=True).agg({
         'trans_amount': 'sum',
         'trans_count': 'sum'
     })
@@ -209,6 +324,7 @@ def plot_quarterly_comparison(df):
     
     return fig
 
+@cached_figure
 def plot_top_districts_bar(df,selected_state="", top_n=10):
 
     df_plot = df.nlargest(top_n, 'trans_amount') 
@@ -237,10 +353,11 @@ def plot_top_districts_bar(df,selected_state="", top_n=10):
 
 # ============ USER VISUALIZATIONS ============
 
+@cached_figure
 def plot_user_engagement(df):
     """Plot user engagement metrics"""
     df = map_state_names(df.copy())
-    grouped = df.groupby('state', as_index=False).agg({
+    grouped = df.groupby('state', as_index=False, observed=True).agg({
         'total_users': 'sum',
         'total_app_opens': 'sum'
     })
@@ -269,12 +386,13 @@ def plot_user_engagement(df):
     
     return fig
 
+@cached_figure
 def plot_device_brands(df):
     """Plot device brand distribution"""
     if 'device_brand' not in df.columns:
         return None
     
-    grouped = df.groupby('device_brand', as_index=False)['total_devices'].sum()
+    grouped = df.groupby('device_brand', as_index=False, observed=True)['total_devices'].sum()
     grouped = grouped[grouped['device_brand'] != '']
     grouped = grouped.nlargest(10, 'total_devices')
     
@@ -299,13 +417,14 @@ def plot_device_brands(df):
     
     return fig
 
+@cached_figure
 def plot_user_growth(df):
     """Plot user growth over time"""
     if 'year' not in df.columns or 'quarter' not in df.columns:
         return None
     
     df['period'] = df['year'].astype(str) + '-Q' + df['quarter'].astype(str)
-    grouped = df.groupby('period', as_index=False)['total_users'].sum()
+    grouped = df.groupby('period', as_index=False, observed=True)['total_users'].sum()
     grouped['total_users'] = grouped['total_users'] / 10000000
     
     fig = px.line(
@@ -331,10 +450,11 @@ def plot_user_growth(df):
 
 # ============ INSURANCE VISUALIZATIONS ============
 
+@cached_figure
 def plot_insurance_map(df):
     """Plot insurance data on India map"""
     df = map_state_names(df.copy())
-    grouped = df.groupby('state', as_index=False)['insur_amount'].sum()
+    grouped = df.groupby('state', as_index=False, observed=True)['insur_amount'].sum()
     
     return plot_india_choropleth(
         grouped,
@@ -0,0 +1,34 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+from sqlalchemy import create_engine
+from src.sql import backend
+from src.sql.backend import read_arrow
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """SQLite database read through the MySQL path, two rows per Arrow batch"""
+    monkeypatch.setattr(backend, 'STORAGE_BACKEND', 'mysql')
+    monkeypatch.setattr(backend, 'ARROW_BATCH_ROWS', 2)
+    engine = create_engine('sqlite://')
+    pd.DataFrame({
+        'state': ['goa', 'bihar', 'goa', 'kerala', 'goa'],
+        # The first batch holds only NULLs
+        'app_opens': [None, None, 3, 4, 5]
+    }).to_sql('map_user', engine, index=False)
+    return engine
+
+
+def test_batches_are_combined_into_one_table(engine):
+    table = read_arrow("SELECT state, app_opens FROM map_user ORDER BY rowid", engine=engine)
+    assert table.num_rows == 5
+    assert table.column('app_opens').to_pylist() == [None, None, 3.0, 4.0, 5.0]
+    assert pa.types.is_dictionary(table.schema.field('state').type)
+    assert table.column('state').to_pylist() == ['goa', 'bihar', 'goa', 'kerala', 'goa']
+
+
+def test_parameters_and_empty_results(engine):
+    table = read_arrow("SELECT state, app_opens FROM map_user WHERE state = %s", ['delhi'], engine)
+    assert table.num_rows == 0
+    assert table.column_names == ['state', 'app_opens']
@@ -0,0 +1,48 @@
+import pandas as pd
+import pyarrow as pa
+from src.dtypes import compact_dtypes
+
+
+def test_known_columns_get_the_shared_dtypes():
+    df = compact_dtypes(pd.DataFrame({
+        'year': [2022, 2023],
+        'quarter': [1, 4],
+        'state': ['goa', 'bihar'],
+        'device_brand': ['Xiaomi', 'Apple'],
+        'device_percentage': [0.25, 0.75],
+        'trans_amount': [1.5e12, 2.5e12],
+        'trans_count': [10, 20]
+    }))
+    assert df['year'].dtype == 'int16'
+    assert df['quarter'].dtype == 'int8'
+    assert isinstance(df['state'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['device_brand'].dtype, pd.CategoricalDtype)
+    assert df['device_percentage'].dtype == 'float32'
+    # Amounts and counts stay 64-bit
+    assert df['trans_amount'].dtype == 'float64'
+    assert df['trans_count'].dtype == 'int64'
+
+
+def test_values_are_unchanged():
+    df = pd.DataFrame({'year': [2018, 2024], 'state': ['goa', None], 'device_percentage': [0.125, 0.5]})
+    compacted = compact_dtypes(df.copy())
+    assert compacted['year'].tolist() == [2018, 2024]
+    assert compacted['state'].iloc[0] == 'goa'
+    assert pd.isna(compacted['state'].iloc[1])
+    assert compacted['device_percentage'].tolist() == [0.125, 0.5]
+
+
+def test_nullable_and_arrow_columns_are_left_alone():
+    df = pd.DataFrame({
+        'year': pd.array([2022, 2023], dtype=pd.ArrowDtype(pa.int64())),
+        'quarter': [1.0, None],
+        'state': pd.Categorical(['goa', 'goa'])
+    })
+    compacted = compact_dtypes(df.copy())
+    assert compacted.dtypes.equals(df.dtypes)
+
+
+def test_empty_results_get_the_same_dtypes():
+    empty = compact_dtypes(pd.DataFrame({'year': pd.Series(dtype='int64'), 'state': pd.Series(dtype=object)}))
+    assert empty['year'].dtype == 'int16'
+    assert isinstance(empty['state'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,62 @@
+import json
+from src.etl.extract import extract_file
+from src.etl.datasets import AGGREGATED, MAP, TOP, MISSING
+
+
+def extract(tmp_path, spec, data, state='goa', year=2022, quarter=1):
+    """Records extract_file() yields for one quarter file holding `data`"""
+    path = tmp_path / f"{quarter}.json"
+    path.write_text(json.dumps({'success': True, 'data': data}))
+    return list(extract_file(spec, 'json', (state, year, quarter, str(path))))
+
+
+def test_list_section(tmp_path):
+    data = {'transactionData': [
+        {'name': 'Merchant payments', 'paymentInstruments': [{'type': 'TOTAL', 'count': 10, 'amount': 250.5}]},
+        {'name': 'Others', 'paymentInstruments': []}
+    ]}
+    assert extract(tmp_path, AGGREGATED['aggr_transaction'], data) == [
+        (2022, 1, 'goa', 'Merchant payments', 10, 250.5),
+        (2022, 1, 'goa', 'Others', 0, 0)
+    ]
+
+
+def test_single_section_reads_one_record(tmp_path):
+    data = {'aggregated': {'registeredUsers': 1200, 'appOpens': 0}, 'usersByDevice': None}
+    assert extract(tmp_path, AGGREGATED['aggr_user'], data) == [(2022, 1, 'goa', 1200, 0)]
+    assert extract(tmp_path, AGGREGATED['aggr_user_device'], data) == []
+
+
+def test_object_section_keys_become_a_column(tmp_path):
+    data = {'hoverData': {
+        'north goa district': {'registeredUsers': 30, 'appOpens': 40},
+        'south goa district': {'registeredUsers': 10}
+    }}
+    assert extract(tmp_path, MAP['map_user'], data) == [
+        (2022, 1, 'goa', 'north goa district', 30, 40),
+        (2022, 1, 'goa', 'south goa district', 10, 0)
+    ]
+
+
+def test_top_sections(tmp_path):
+    metric = {'type': 'TOTAL', 'count': 5, 'amount': 7.5}
+    data = {
+        'states': None,
+        'districts': [{'entityName': 'north goa', 'metric': metric}],
+        'pincodes': [{'entityName': '403001', 'metric': metric}, {'entityName': '', 'metric': metric}]
+    }
+    assert extract(tmp_path, TOP['top_transaction'], data) == [
+        (2022, 1, 'goa', 'north goa', MISSING, 'TOTAL', 5, 7.5),
+        (2022, 1, 'goa', MISSING, '403001', 'TOTAL', 5, 7.5),
+        (2022, 1, 'goa', MISSING, MISSING, 'TOTAL', 5, 7.5)
+    ]
+
+
+def test_state_rows_take_the_state_from_the_record(tmp_path):
+    data = {'states': [{'entityName': 'goa', 'metric': {'type': 'TOTAL', 'count': 1, 'amount': 2.0}}]}
+    rows = extract(tmp_path, TOP['top_transaction'], data, state='india')
+    assert rows == [(2022, 1, 'goa', MISSING, MISSING, 'TOTAL', 1, 2.0)]
+
+    data = {'states': [{'name': 'goa', 'registeredUsers': 3}]}
+    rows = extract(tmp_path, TOP['top_user'], data, state='goa')
+    assert rows == [(2022, 1, 'goa', MISSING, MISSING, 3)]
@@ -0,0 +1,67 @@
+from src.etl.build_geojson import douglas_peucker, simplify_geojson, point_count
+
+
+def square_pair(border):
+    """Two states either side of a shared border running from (1, 0) up to (1, 2)"""
+    west = [(0, 0), *border, (0, 2), (0, 0)]
+    east = [(2, 0), (2, 2), *border[::-1], (2, 0)]
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'ST_NM': 'West', 'id': 1},
+         'geometry': {'type': 'Polygon', 'coordinates': [[list(point) for point in west]]}},
+        {'type': 'Feature', 'properties': {'ST_NM': 'East', 'id': 2},
+         'geometry': {'type': 'Polygon', 'coordinates': [[list(point) for point in east]]}}
+    ]}
+
+
+def border_points(feature):
+    return {tuple(point) for point in feature['geometry']['coordinates'][0] if 0.9 < point[0] < 1.1}
+
+
+def test_douglas_peucker_drops_points_within_tolerance():
+    line = [(0, 0), (1, 0.001), (2, -0.001), (3, 0)]
+    assert douglas_peucker(line, 0.01) == [(0, 0), (3, 0)]
+    assert douglas_peucker(line, 0.0001) == line
+
+
+def test_douglas_peucker_keeps_spikes_and_ends():
+    line = [(0, 0), (1, 0), (1.5, 1), (2, 0), (3, 0)]
+    assert douglas_peucker(line, 0.1) == [(0, 0), (1, 0), (1.5, 1), (2, 0), (3, 0)]
+    assert douglas_peucker(line, 2) == [(0, 0), (3, 0)]
+    assert douglas_peucker([(0, 0), (1, 1)], 10) == [(0, 0), (1, 1)]
+
+
+def test_shared_border_is_simplified_the_same_on_both_sides():
+    # A wiggly border with one bump that is larger than the tolerance
+    border = [(1 + (0.001 if i % 2 else -0.001), i / 10) for i in range(21)]
+    border[10] = (1.05, 1.0)
+    border[0], border[-1] = (1, 0), (1, 2)
+    source = square_pair(border)
+
+    simplified = simplify_geojson(source, tolerance=0.01, precision=5)
+    west, east = simplified['features']
+    assert border_points(west) == border_points(east)
+    assert (1.05, 1.0) in border_points(west)
+    assert len(border_points(west)) < len(border)
+    assert point_count(simplified) < point_count(source)
+
+
+def test_properties_and_precision():
+    border = [(1, 0), (1.123456789, 1), (1, 2)]
+    simplified = simplify_geojson(square_pair(border), tolerance=0.0, precision=3)
+    west = simplified['features'][0]
+    assert west['properties'] == {'ST_NM': 'West'}
+    assert [1.123, 1] in west['geometry']['coordinates'][0]
+
+
+def test_collapsed_holes_are_dropped():
+    outer = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+    hole = [[2, 2], [2.001, 2], [2.001, 2.001], [2, 2.001], [2, 2]]
+    source = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'ST_NM': 'Lake'},
+         'geometry': {'type': 'Polygon', 'coordinates': [outer, hole]}}
+    ]}
+    assert simplify_geojson(source, 0.0, 5)['features'][0]['geometry']['coordinates'] == [outer, hole]
+
+    rings = simplify_geojson(source, 0.01, 5)['features'][0]['geometry']['coordinates']
+    assert len(rings) == 1
+    assert rings[0][0] == rings[0][-1] and len(rings[0]) >= 4
@@ -0,0 +1,70 @@
+import os
+from src.etl.manifest import plan_changes, manifest_entry, manifest_path
+
+
+def write_file(tmp_path, state, year, quarter, content):
+    """Quarter file laid out like pulse/data, returned as a (state, year, quarter, file_path) task"""
+    folder = tmp_path / state / str(year)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{quarter}.json"
+    path.write_text(content)
+    return (state, year, quarter, str(path))
+
+
+def load(tasks):
+    """Manifest as load_manifest() returns it after loading every task"""
+    return {manifest_path(task[3]): manifest_entry('aggr_transaction', task, 1) for task in tasks}
+
+
+def test_new_files_dirty_their_partitions(tmp_path):
+    tasks = [
+        write_file(tmp_path, 'goa', 2022, 1, '{}'),
+        write_file(tmp_path, 'bihar', 2022, 1, '{}'),
+        write_file(tmp_path, 'goa', 2022, 2, '{}')
+    ]
+    dirty, refreshed = plan_changes(tasks, {})
+    assert dirty == {(2022, 1): tasks[:2], (2022, 2): tasks[2:]}
+    assert refreshed == []
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    tasks = [write_file(tmp_path, 'goa', 2022, 1, '{}')]
+    assert plan_changes(tasks, load(tasks)) == ({}, [])
+
+
+def test_touched_file_only_refreshes_its_entry(tmp_path):
+    tasks = [write_file(tmp_path, 'goa', 2022, 1, '{}')]
+    manifest = load(tasks)
+    stat = os.stat(tasks[0][3])
+    os.utime(tasks[0][3], (stat.st_atime, stat.st_mtime + 60))
+
+    dirty, refreshed = plan_changes(tasks, manifest)
+    assert dirty == {}
+    assert len(refreshed) == 1
+    assert refreshed[0]['file_mtime'] == stat.st_mtime + 60
+
+
+def test_changed_file_reloads_the_whole_partition(tmp_path):
+    tasks = [
+        write_file(tmp_path, 'goa', 2022, 1, '{}'),
+        write_file(tmp_path, 'bihar', 2022, 1, '{}'),
+        write_file(tmp_path, 'goa', 2022, 2, '{}')
+    ]
+    manifest = load(tasks)
+    write_file(tmp_path, 'goa', 2022, 1, '{"data": null}')
+
+    dirty, refreshed = plan_changes(tasks, manifest)
+    assert dirty == {(2022, 1): tasks[:2]}
+    assert refreshed == []
+
+
+def test_removed_file_reloads_its_partition(tmp_path):
+    tasks = [
+        write_file(tmp_path, 'goa', 2022, 1, '{}'),
+        write_file(tmp_path, 'bihar', 2022, 1, '{}'),
+        write_file(tmp_path, 'goa', 2023, 1, '{}')
+    ]
+    manifest = load(tasks)
+
+    dirty, _ = plan_changes(tasks[:1], manifest)
+    assert dirty == {(2022, 1): tasks[:1], (2023, 1): []}
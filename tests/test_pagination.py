@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+from src.sql import backend
+from src.sql.sql_queries import fetch_table_page, count_table_rows
+
+duckdb = pytest.importorskip('duckdb')
+
+ROWS = pd.DataFrame({
+    'year': [2022] * 6 + [2023] * 4,
+    'quarter': [1, 1, 1, 2, 2, 2, 1, 1, 1, 1],
+    'state': ['goa', 'goa', 'bihar', 'goa', 'bihar', 'bihar', 'goa', 'goa', 'bihar', 'bihar'],
+    'district': ['north goa', 'south goa', 'patna', 'north goa', 'patna', 'gaya',
+                 'north goa', 'south goa', 'patna', 'gaya'],
+    'trans_type': ['TOTAL'] * 10,
+    'trans_count': [5, 5, 1, 2, None, 7, 3, 3, 9, 4],
+    # Ties and a NULL measure, which must neither repeat nor drop rows
+    'trans_amount': [50.0, 50.0, 10.0, 20.0, None, 70.0, 30.0, 30.0, 90.0, 40.0]
+})
+
+
+@pytest.fixture(autouse=True)
+def duckdb_table(monkeypatch):
+    """map_transaction in an in-memory DuckDB database serving every query"""
+    conn = duckdb.connect()
+    conn.register('rows', ROWS)
+    conn.execute("CREATE TABLE map_transaction AS SELECT * FROM rows")
+    # top_transaction rows: the same districts, one pincode each, plus a row with no district
+    conn.execute("""
+        CREATE TABLE top_transaction AS
+        SELECT year, quarter, state, district, district || ' pin' AS pincode, trans_type, trans_count, trans_amount FROM rows
+        UNION ALL SELECT 2022, 1, 'goa', '-- Missing Data --', '403001', 'TOTAL', 1, 1000.0
+    """)
+    monkeypatch.setattr(backend, 'STORAGE_BACKEND', 'duckdb')
+    monkeypatch.setattr(backend, 'get_duckdb', lambda: conn)
+    yield
+    conn.close()
+
+
+def all_pages(page_size, table_name='map_transaction', **filters):
+    """Walk every page of a table, returning the pages"""
+    pages = []
+    after = None
+    for _ in range(len(ROWS) + 1):
+        rows, after = fetch_table_page(table_name, after=after, page_size=page_size, **filters)
+        if rows.empty:
+            return pages
+        pages.append(rows)
+    pytest.fail("pagination never reached an empty page")
+
+
+def keys(df):
+    return list(zip(df['year'], df['quarter'], df['state'], df['district']))
+
+
+def test_pages_cover_the_table_once_in_primary_key_order():
+    pages = all_pages(3)
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    expected = ROWS.sort_values(['year', 'quarter', 'state', 'district'])
+    assert keys(pd.concat(pages)) == keys(expected)
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_sorting_by_a_measure_with_ties_and_nulls(descending):
+    pages = all_pages(3, sort_by='trans_amount', descending=descending)
+    rows = pd.concat(pages)
+    assert len(rows) == len(ROWS)
+    assert len(set(keys(rows))) == len(ROWS)
+    amounts = rows['trans_amount'].fillna(0).tolist()
+    assert amounts == sorted(amounts, reverse=descending)
+
+
+def test_filters_apply_to_every_page():
+    rows = pd.concat(all_pages(2, year=2022, state='bihar'))
+    assert keys(rows) == [(2022, 1, 'bihar', 'patna'), (2022, 2, 'bihar', 'gaya'), (2022, 2, 'bihar', 'patna')]
+
+
+def test_last_page_returns_no_key():
+    rows, after = fetch_table_page('map_transaction', year=2030)
+    assert rows.empty and after is None
+
+
+def test_grouped_pages_sum_per_district_largest_first():
+    expected = (ROWS.assign(trans_amount=ROWS['trans_amount'].fillna(0))
+                .groupby(['year', 'quarter', 'state', 'district'])['trans_amount'].sum()
+                .sort_values(ascending=False))
+    pages = all_pages(2, 'top_transaction_district', sort_by='total_trans_amount', descending=True)
+    rows = pd.concat(pages)
+    assert count_table_rows('top_transaction_district') == len(rows) == len(expected)
+    # Ties are broken by the group columns, so no district repeats or goes missing
+    assert sorted(keys(rows)) == sorted(expected.index)
+    assert rows['total_trans_amount'].tolist() == expected.tolist()
+    assert '-- Missing Data --' not in set(rows['district'])
+
+
+def test_grouped_pages_apply_the_filters_before_summing():
+    rows = pd.concat(all_pages(2, 'top_transaction_pincode', year=2023, state='goa'))
+    assert list(zip(rows['pincode'], rows['total_trans_amount'])) == [('north goa pin', 30.0), ('south goa pin', 30.0)]
+    assert count_table_rows('top_transaction_pincode', year=2023, state='goa') == 2
+
+
+def test_unknown_table_or_column_is_rejected():
+    with pytest.raises(ValueError):
+        fetch_table_page('etl_manifest')
+    with pytest.raises(ValueError):
+        fetch_table_page('map_transaction', sort_by='trans_amount; DROP TABLE map_transaction')
+    with pytest.raises(ValueError):
+        count_table_rows('top_transaction_state')
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from src.sql import rollups
+from src.sql.rollups import ROLLUPS, choose_rollup, route, build_rollup, rollups_for
+
+ROWS = pd.DataFrame({
+    'year': [2022, 2022, 2022, 2022, 2023],
+    'quarter': [1, 1, 1, 2, 1],
+    'state': ['goa', 'goa', 'bihar', 'goa', 'goa'],
+    'trans_type': ['Merchant payments', 'Others', 'Others', 'Others', 'Others'],
+    'trans_count': [10, 0, 4, 3, 5],
+    'trans_amount': [100.0, 7.0, 40.0, 9.0, 50.0]
+})
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """SQLite database holding aggr_transaction, with no rollups built yet"""
+    monkeypatch.setattr('src.sql.backend.STORAGE_BACKEND', 'mysql')
+    engine = create_engine('sqlite://')
+    ROWS.to_sql('aggr_transaction', engine, index=False)
+    rollups._existing_rollups.clear()
+    yield engine
+    rollups._existing_rollups.clear()
+
+
+def build(engine, names):
+    with engine.begin() as conn:
+        for name in names:
+            build_rollup(conn, name)
+    rollups._existing_rollups.clear()
+
+
+def query(engine, source, dimensions):
+    """Per-state totals and averages the way sql_analysis builds them on top of route()"""
+    table, filters, measure = route(engine, source, dimensions)
+    where = " AND ".join(filters + ["year = 2022"])
+    return table, pd.read_sql(f"""
+        SELECT state, {measure('trans_amount')} AS amount, {measure('avg_value', 'avg')} AS avg_value
+        FROM {table} WHERE {where} GROUP BY state ORDER BY state
+    """, engine)
+
+
+def test_no_rollup_until_built(engine):
+    assert choose_rollup(engine, 'aggr_transaction', ('year', 'quarter')) is None
+    table, filters, _ = route(engine, 'top_transaction', ('state',), rollups.PINCODE_ROWS)
+    assert (table, filters) == ('top_transaction', [rollups.PINCODE_ROWS])
+
+
+def test_smallest_covering_rollup_wins(engine):
+    build(engine, rollups_for('aggr_transaction'))
+    assert choose_rollup(engine, 'aggr_transaction', ('year', 'quarter')) == 'rollup_transaction_quarter'
+    assert choose_rollup(engine, 'aggr_transaction', ('year', 'quarter', 'state')) == 'rollup_transaction_state'
+    assert choose_rollup(engine, 'aggr_transaction', ('year', 'quarter', 'state', 'trans_type')) is None
+
+
+def test_rollup_needs_the_same_row_filter(engine):
+    build(engine, rollups_for('aggr_transaction'))
+    assert choose_rollup(engine, 'aggr_transaction', ('year', 'quarter'), rollups.PINCODE_ROWS) is None
+
+
+def test_rollup_answers_like_the_raw_table(engine):
+    _, raw = query(engine, 'aggr_transaction', ('state',))
+    build(engine, ['rollup_transaction_state'])
+    table, rolled = query(engine, 'aggr_transaction', ('state',))
+    assert table == 'rollup_transaction_state'
+    pd.testing.assert_frame_equal(rolled, raw)
+
+
+def test_partition_refresh_matches_a_full_build(engine):
+    build(engine, ['rollup_transaction_state'])
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE aggr_transaction SET trans_amount = trans_amount * 2 WHERE year = 2022 AND quarter = 2"))
+        build_rollup(conn, 'rollup_transaction_state', [(2022, 2)])
+    refreshed = pd.read_sql("SELECT * FROM rollup_transaction_state ORDER BY year, quarter, state", engine)
+
+    build(engine, ['rollup_transaction_state'])
+    rebuilt = pd.read_sql("SELECT * FROM rollup_transaction_state ORDER BY year, quarter, state", engine)
+    pd.testing.assert_frame_equal(refreshed, rebuilt)
+
+
+def test_every_rollup_keeps_its_partition_columns():
+    for name, rollup in ROLLUPS.items():
+        assert rollup['dimensions'][:2] == ('year', 'quarter'), name
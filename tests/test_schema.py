@@ -0,0 +1,40 @@
+import os
+import re
+from src.sql.schema import TABLES
+
+CREATE_TABLES = os.path.join(os.path.dirname(__file__), '..', 'src', 'sql', 'create_tables.sql')
+
+
+def sql_tables():
+    """{table: (columns, primary key, indexes)} as written in create_tables.sql"""
+    with open(CREATE_TABLES, encoding='utf-8') as f:
+        sql = f.read()
+    tables = {}
+    for name, body in re.findall(r"CREATE TABLE IF NOT EXISTS (\w+) \((.*?)\n\);", sql, re.S):
+        columns, primary_key, indexes = {}, None, {}
+        for line in body.strip().splitlines():
+            line = line.strip().rstrip(',')
+            if line.startswith('PRIMARY KEY'):
+                primary_key = tuple(re.search(r"\((.*)\)", line).group(1).split(', '))
+            elif line.startswith('KEY'):
+                index, index_columns = re.match(r"KEY (\w+) \((.*)\)", line).groups()
+                indexes[index] = tuple(index_columns.split(', '))
+            else:
+                column, column_type = line.split(' ', 1)
+                columns[column] = column_type
+        tables[name] = (columns, primary_key, indexes)
+    return tables
+
+
+def test_create_tables_matches_the_managed_schema():
+    tables = sql_tables()
+    for name, spec in TABLES.items():
+        assert name in tables, name
+        columns, primary_key, indexes = tables[name]
+        assert columns == spec['columns'], name
+        assert primary_key == spec['primary_key'], name
+        assert indexes == {f"idx_{name}_{index}": index_columns for index, index_columns in spec['indexes'].items()}, name
+
+
+def test_create_tables_has_no_unmanaged_pulse_tables():
+    assert set(sql_tables()) - set(TABLES) == {'etl_manifest'}
@@ -0,0 +1,83 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.sql.snapshot import call_key, snapshot_calls, SnapshotAnalytics, MANIFEST
+
+
+def test_call_key_fills_in_defaults():
+    key = call_key('get_top_states_by_transaction_amount', (2022,))
+    assert key == call_key('get_top_states_by_transaction_amount', (), {'year': 2022})
+    assert key == call_key('get_top_states_by_transaction_amount', (2022, None), {'limit': 10})
+    assert key != call_key('get_top_states_by_transaction_amount', (2022,), {'limit': 50})
+
+
+def test_call_key_accepts_numpy_scalars():
+    assert call_key('get_quarterly_trends', (np.int64(2022),)) == call_key('get_quarterly_trends', (2022,))
+
+
+def test_call_key_rejects_unknown_arguments():
+    with pytest.raises(TypeError):
+        call_key('get_quarterly_trends', (2022,), {'quarter': 1})
+
+
+def test_snapshot_covers_the_dashboard_calls():
+    calls = snapshot_calls([2021, 2022], [1, 2, 3, 4], ['goa'], {'aggr_transaction': ['Others']})
+    keys = [call_key(name, args, kwargs) for name, args, kwargs in calls]
+    assert len(keys) == len(set(keys))
+
+    keys = set(keys)
+    for name, args, kwargs in [
+        ('get_executive_summary', (None, None), {}),
+        ('get_executive_summary', (2022, 3), {}),
+        ('get_top_states_by_transaction_amount', (2022, None), {'limit': 50}),
+        ('get_quarterly_trends', (2021,), {}),
+        ('get_top_districts_by_transaction', ('goa', None), {'limit': 10}),
+        ('get_heatmap_data', ('Transactions', 'District', 2022, 4, 'Others'), {}),
+        ('get_heatmap_data', ('Users', 'Pincode', 2021, 1, None), {}),
+        ('get_year_over_year_growth', (), {})
+    ]:
+        assert call_key(name, args, kwargs) in keys
+
+
+def write_snapshot(path, results):
+    """Snapshot directory holding the given {(method, args): DataFrame} results"""
+    manifest = {}
+    for i, ((name, args), df) in enumerate(results.items()):
+        df.to_parquet(os.path.join(path, f"{i}.parquet"), index=False)
+        manifest[call_key(name, args)] = f"{i}.parquet"
+    with open(os.path.join(path, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+
+def test_snapshot_analytics_serves_stored_results(tmp_path):
+    trends = pd.DataFrame({'year': [2022], 'quarter': [1], 'state': ['goa'], 'total': [5.0]})
+    empty = pd.DataFrame({'year': pd.Series(dtype='int64'), 'state': pd.Series(dtype=object)})
+    write_snapshot(tmp_path, {('get_quarterly_trends', (2022,)): trends, ('get_quarterly_trends', (2023,)): empty})
+
+    analytics = SnapshotAnalytics(str(tmp_path))
+    result = analytics.get_quarterly_trends(year=2022)
+    assert result['total'].tolist() == [5.0]
+    assert result['year'].dtype == 'int16'
+    assert isinstance(result['state'].dtype, pd.CategoricalDtype)
+
+    # Empty results come back with the same dtypes as full ones
+    assert isinstance(analytics.get_quarterly_trends(2023)['state'].dtype, pd.CategoricalDtype)
+
+    with pytest.raises(KeyError):
+        analytics.get_quarterly_trends(2024)
+    with pytest.raises(AttributeError):
+        analytics.run_everything()
+
+
+def test_snapshot_analytics_picks_up_a_rebuild(tmp_path):
+    write_snapshot(tmp_path, {('get_user_growth_rate', ()): pd.DataFrame({'growth': [1.0]})})
+    analytics = SnapshotAnalytics(str(tmp_path))
+    assert analytics.get_user_growth_rate()['growth'].tolist() == [1.0]
+
+    write_snapshot(tmp_path, {('get_user_growth_rate', ()): pd.DataFrame({'growth': [2.0]})})
+    manifest = os.path.join(tmp_path, MANIFEST)
+    stat = os.stat(manifest)
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert analytics.get_user_growth_rate()['growth'].tolist() == [2.0]